@@ -0,0 +1,93 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+"""Columnar stream snapshots versus ``Stream`` objects.
+
+Builds a synthetic crawl of ``--streams`` rows both as :class:`twitch.Stream` objects and
+as :class:`twitch.StreamColumns`, then times viewers-per-game aggregation on each.
+
+Usage: ``python benchmarks/bench_columnar.py [--streams 100000]``
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_json import make_stream  # noqa: E402
+from twitch.columnar import StreamColumns, numpy  # noqa: E402
+from twitch.stream import Stream  # noqa: E402
+
+
+class FakeClient:
+    lazy_models = False
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=100000, help="rows in the crawl")
+    args = parser.parse_args()
+
+    pages = []
+    for start in range(0, args.streams, 100):
+        pages.append([make_stream(i) for i in range(start, min(start + 100, args.streams))])
+
+    def build_objects():
+        return [Stream(FakeClient, element) for page in pages for element in page]
+
+    def build_columns():
+        columns = StreamColumns()
+        for page in pages:
+            columns.add_page(page)
+        return columns
+
+    def sum_objects():
+        sums = Counter()
+        for stream in streams:
+            sums[stream.game_id] += stream.viewer_count
+        return sums
+
+    print(f"{args.streams} streams, NumPy {'installed' if numpy else 'not installed'}")
+    streams, elapsed, peak = measure(build_objects)
+    print(f"{'Stream objects: build':<28} {elapsed * 1e3:9.1f} ms {peak / 2 ** 20:8.1f} MiB")
+    columns, elapsed, peak = measure(build_columns)
+    print(f"{'StreamColumns: build':<28} {elapsed * 1e3:9.1f} ms {peak / 2 ** 20:8.1f} MiB")
+    _, elapsed, _ = measure(sum_objects)
+    print(f"{'Stream objects: sum by game':<28} {elapsed * 1e3:9.1f} ms")
+    _, elapsed, _ = measure(columns.sum_by)
+    print(f"{'StreamColumns: sum by game':<28} {elapsed * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
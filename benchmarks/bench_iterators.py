@@ -0,0 +1,122 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+"""End-to-end throughput of the iterators against the local fake Helix server.
+
+For every iterator and concurrency level, runs that many iterators at once and reports
+items per second together with p50/p99 latency of the underlying requests, so
+regressions in ``HTTPClient.request`` show up.
+
+Usage: ``python benchmarks/bench_iterators.py [--concurrency 1 10 50] [--latency 0.02]``
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_helix import FakeHelix, LANGUAGES  # noqa: E402
+from twitch import Client  # noqa: E402
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run(helix: FakeHelix, url: str, concurrency: int, make_iterator: Callable) -> tuple:
+    latencies = []
+    client = Client("benchmark", "secret", base_url=f"{url}/helix", token_url=f"{url}/oauth2/token")
+    client.http.add_hook("request_end", lambda route, elapsed, error: latencies.append(elapsed))
+
+    async def consume(i: int) -> int:
+        count = 0
+        async for _ in make_iterator(client, i):
+            count += 1
+        return count
+
+    requests = helix.requests
+    started = time.perf_counter()
+    counts = await asyncio.gather(*(consume(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await client.close()
+    return (
+        sum(counts) / elapsed,
+        percentile(latencies, 0.5),
+        percentile(latencies, 0.99),
+        helix.requests - requests,
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.02, help="server latency")
+    parser.add_argument("--jitter", type=float, default=0.01, help="random extra latency")
+    parser.add_argument("--ratelimit", type=int, default=100000, help="server bucket size")
+    parser.add_argument("--streams", type=int, default=2000, help="streams per iterator")
+    parser.add_argument("--lookups", type=int, default=500, help="IDs per lookup iterator")
+    args = parser.parse_args()
+
+    helix = FakeHelix(
+        streams=max(args.streams, args.lookups) * 2,
+        ratelimit=args.ratelimit,
+        latency=args.latency,
+        jitter=args.jitter,
+    )
+    runner = await helix.start()
+    url = f"http://127.0.0.1:{helix.port}"
+    user_ids = list(helix.users)
+    game_ids = list(helix.games)
+
+    scenarios = {
+        "StreamIterator": lambda client, i: client.get_streams(limit=args.streams).filter(
+            languages=[LANGUAGES[i % len(LANGUAGES)]]
+        ),
+        "UserIterator": lambda client, i: client.get_users(
+            ids=random.Random(i).sample(user_ids, args.lookups)
+        ),
+        "GameIterator": lambda client, i: client.get_games(
+            ids=random.Random(i).sample(game_ids, min(args.lookups, len(game_ids)))
+        ),
+    }
+
+    print(f"{'iterator':<16}{'tasks':>6}{'items/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'reqs':>8}")
+    try:
+        for name, make_iterator in scenarios.items():
+            for concurrency in args.concurrency:
+                rate, p50, p99, requests = await run(helix, url, concurrency, make_iterator)
+                print(
+                    f"{name:<16}{concurrency:>6}{rate:>12.0f}"
+                    f"{p50 * 1000:>10.1f}{p99 * 1000:>10.1f}{requests:>8}"
+                )
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+"""Per-page JSON parse cost of large ``/streams`` pages.
+
+Compares the former ``response.text()`` + :func:`json.loads` path with decoding the raw
+body bytes directly, using every decoder that is installed.
+
+Usage: ``python benchmarks/bench_json.py [--items 100] [--number 2000]``
+"""
+import argparse
+import importlib
+import json
+import random
+import string
+import timeit
+
+
+def make_stream(i: int) -> dict:
+    title = "".join(random.choices(string.ascii_letters + " ", k=random.randint(20, 140)))
+    return {
+        "id": str(40000000000 + i),
+        "user_id": str(10000000 + i),
+        "user_name": f"Streamer{i}",
+        "game_id": str(random.randint(1, 600000)),
+        "type": "live",
+        "title": title,
+        "viewer_count": random.randint(0, 100000),
+        "started_at": "2020-11-08T12:34:56Z",
+        "language": random.choice(["en", "de", "ru", "es", "pt", "ja", "ko", "fr"]),
+        "thumbnail_url": f"https://static-cdn.jtvnw.net/previews-ttv/live_user_s{i}"
+        "-{width}x{height}.jpg",
+        "tag_ids": ["6ea6bca4-4712-4ab9-a906-e3336a9d8039"],
+    }
+
+
+def make_page(items: int) -> bytes:
+    page = {
+        "data": [make_stream(i) for i in range(items)],
+        "pagination": {"cursor": "eyJiIjpudWxsLCJhIjp7Ik9mZnNldCI6MTAwfX0"},
+    }
+    return json.dumps(page).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="streams per page")
+    parser.add_argument("--number", type=int, default=2000, help="pages parsed per run")
+    args = parser.parse_args()
+
+    body = make_page(args.items)
+    cases = {"text + json.loads": lambda: json.loads(body.decode("utf-8"))}
+    cases["bytes + json.loads"] = lambda: json.loads(body)
+    for name in ("ujson", "orjson"):
+        try:
+            loads = importlib.import_module(name).loads
+        except ImportError:
+            print(f"{name} is not installed, skipping")
+            continue
+        cases[f"bytes + {name}.loads"] = lambda loads=loads: loads(body)
+
+    print(f"page size: {len(body) / 1024:.1f} KiB, {args.items} streams")
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=args.number, repeat=5)) / args.number
+        print(f"{name:<24} {best * 1e6:10.1f} us/page")
+
+
+if __name__ == "__main__":
+    main()
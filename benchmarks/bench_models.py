@@ -0,0 +1,95 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+"""Eager versus lazy decoding of ``Stream`` payloads.
+
+Measures building 100-stream pages of models and reading a few or all attributes in
+both modes, plus ``datetime.strptime`` against :func:`twitch.utils.parse_timestamp`.
+
+Usage: ``python benchmarks/bench_models.py [--number 200]``
+"""
+import argparse
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_json import make_stream  # noqa: E402
+from twitch.stream import Stream  # noqa: E402
+from twitch.utils import parse_timestamp  # noqa: E402
+
+
+class FakeClient:
+    def __init__(self, lazy_models: bool):
+        self.lazy_models = lazy_models
+
+
+def read_few(streams):
+    for stream in streams:
+        stream.user_id, stream.viewer_count
+
+
+def read_all(streams):
+    for stream in streams:
+        (
+            stream.game_id,
+            stream.id,
+            stream.language,
+            stream.started_at,
+            stream.tag_ids,
+            stream.title,
+            stream.live,
+            stream.user_id,
+            stream.user_name,
+            stream.viewer_count,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="pages per run")
+    args = parser.parse_args()
+
+    page = [make_stream(i) for i in range(100)]
+    timestamp = page[0]["started_at"]
+    cases = {
+        "strptime": lambda: datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S%z"),
+        "parse_timestamp": lambda: parse_timestamp(timestamp),
+    }
+    for mode in ("eager", "lazy"):
+        client = FakeClient(mode == "lazy")
+        cases[f"{mode}: build page"] = lambda c=client: [Stream(c, d) for d in page]
+        cases[f"{mode}: build + read 2 attrs"] = lambda c=client: read_few(
+            [Stream(c, d) for d in page]
+        )
+        cases[f"{mode}: build + read all"] = lambda c=client: read_all([Stream(c, d) for d in page])
+
+    for name, func in cases.items():
+        number = args.number * 100 if name in ("strptime", "parse_timestamp") else args.number
+        best = min(timeit.repeat(func, number=number, repeat=5)) / number
+        unit = "call" if number != args.number else "page"
+        print(f"{name:<28} {best * 1e6:10.2f} us/{unit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+"""Local stand-in for the Helix API and the OAuth token endpoint.
+
+Serves synthetic ``/helix/games``, ``/helix/streams``, ``/helix/users`` and
+``/helix/webhooks/hub`` with Helix-style pagination cursors and ``Ratelimit-*``
+headers, answers 429 once a token's bucket is empty and can inject latency and server
+errors. Responses recorded from the real API can be replayed.
+
+Usage::
+
+    python benchmarks/fake_helix.py --port 8080 --latency 0.05
+    python benchmarks/fake_helix.py --record recorded.jsonl  # proxy to Twitch, record
+    python benchmarks/fake_helix.py --replay recorded.jsonl  # serve recorded responses
+
+Point a client at it with
+``Client(..., base_url="http://127.0.0.1:8080/helix",
+token_url="http://127.0.0.1:8080/oauth2/token")``.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import random
+import secrets
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+LANGUAGES = ("en", "es", "de", "ru", "pt", "fr", "ja", "ko", "it", "zh", "pl", "tr")
+UPSTREAM_URL = "https://api.twitch.tv"
+
+
+def _encode_cursor(offset: int) -> str:
+    # Helix cursors are unpadded, so clients must pass them through untouched.
+    return base64.urlsafe_b64encode(json.dumps({"o": offset}).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))["o"]
+    except (ValueError, KeyError, TypeError):
+        raise web.HTTPBadRequest(text="Invalid cursor")
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float):
+        self.tokens = tokens
+        self.updated = time.monotonic()
+
+
+class FakeHelix:
+    """Synthetic Helix API.
+
+    Attributes
+    -----------
+    streams : List[dict]
+        Live streams, sorted by viewer count in descending order.
+    users : Dict[str, dict]
+        Users by ID.
+    games : Dict[str, dict]
+        Games by ID.
+    requests : int
+        Number of API requests served, excluding token requests.
+    throttled : int
+        Number of requests answered with 429.
+
+    """
+
+    def __init__(
+        self,
+        streams: int = 5000,
+        games: int = 500,
+        ratelimit: int = 800,
+        period: float = 60.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        replay: Optional[str] = None,
+        record: Optional[str] = None,
+    ):
+        rnd = random.Random(seed)
+        self.ratelimit = ratelimit
+        self.period = period
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.throttled = 0
+        self._random = rnd
+        self._buckets: Dict[str, _Bucket] = {}
+        self._replay: Dict[Tuple[str, str, tuple], dict] = {}
+        self._record = record
+        self._upstream = None
+        if replay:
+            self._load_replay(replay)
+
+        self.games = {}
+        for i in range(games):
+            game_id = str(1000 + i)
+            self.games[game_id] = {
+                "id": game_id,
+                "name": f"Game {i}",
+                "box_art_url": f"https://static-cdn.jtvnw.net/ttv-boxart/{game_id}"
+                "-{width}x{height}.jpg",
+            }
+        game_ids = list(self.games)
+
+        self.users = {}
+        self.streams = []
+        for i in range(streams):
+            user_id = str(100000 + i)
+            login = f"streamer{i}"
+            self.users[user_id] = {
+                "id": user_id,
+                "login": login,
+                "display_name": f"Streamer{i}",
+                "type": "",
+                "broadcaster_type": rnd.choice(["", "affiliate", "partner"]),
+                "description": f"Channel of streamer {i}",
+                "profile_image_url": f"https://static-cdn.jtvnw.net/u/{user_id}.png",
+                "offline_image_url": "",
+                "view_count": rnd.randint(0, 10 ** 7),
+            }
+            self.streams.append(
+                {
+                    "id": str(40000000000 + i),
+                    "user_id": user_id,
+                    "user_login": login,
+                    "user_name": f"Streamer{i}",
+                    "game_id": rnd.choice(game_ids),
+                    "type": "live",
+                    "title": f"Stream number {i}",
+                    "viewer_count": int(rnd.paretovariate(1.2)),
+                    "started_at": "2020-11-08T12:34:56Z",
+                    "language": rnd.choice(LANGUAGES),
+                    "thumbnail_url": f"https://static-cdn.jtvnw.net/previews-ttv/{login}"
+                    "-{width}x{height}.jpg",
+                    "tag_ids": [],
+                }
+            )
+        self.streams.sort(key=lambda s: s["viewer_count"], reverse=True)
+        self._logins = {u["login"]: u for u in self.users.values()}
+        self._game_names = {g["name"]: g for g in self.games.values()}
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/oauth2/token", self.token)
+        app.router.add_get("/helix/games", self.get_games)
+        app.router.add_get("/helix/streams", self.get_streams)
+        app.router.add_get("/helix/users", self.get_users)
+        app.router.add_post("/helix/webhooks/hub", self.webhooks_hub)
+        app.on_cleanup.append(self._close_upstream)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> web.AppRunner:
+        """Starts the server in the running loop. Returns the runner; the bound port is
+        available as :attr:`port`."""
+        runner = web.AppRunner(self.make_app())
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        self.port = runner.addresses[0][1]
+        return runner
+
+    # Middleware: replay, recording, latency, rate limiting and error injection.
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        if not request.path.startswith("/helix/"):
+            return await handler(request)
+
+        key = (request.method, request.path, tuple(sorted(request.query.items())))
+        if key in self._replay:
+            recorded = self._replay[key]
+            return web.json_response(recorded["body"], status=recorded["status"])
+        if self._record:
+            return await self._proxy(request, key)
+
+        self.requests += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+
+        headers = self._consume(request.headers.get("Authorization", ""))
+        if headers["Ratelimit-Remaining"] == "-1":
+            self.throttled += 1
+            headers["Ratelimit-Remaining"] = "0"
+            return web.json_response(
+                {"error": "Too Many Requests", "status": 429, "message": "Rate limited"},
+                status=429,
+                headers=headers,
+            )
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.json_response(
+                {"error": "Service Unavailable", "status": 503, "message": ""},
+                status=503,
+                headers=headers,
+            )
+
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    def _consume(self, token: str) -> Dict[str, str]:
+        bucket = self._buckets.get(token)
+        if bucket is None:
+            bucket = self._buckets[token] = _Bucket(float(self.ratelimit))
+        now = time.monotonic()
+        rate = self.ratelimit / self.period
+        bucket.tokens = min(float(self.ratelimit), bucket.tokens + (now - bucket.updated) * rate)
+        bucket.updated = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            remaining = int(bucket.tokens)
+        else:
+            remaining = -1
+        reset = time.time() + (self.ratelimit - bucket.tokens) / rate
+        return {
+            "Ratelimit-Limit": str(self.ratelimit),
+            "Ratelimit-Remaining": str(remaining),
+            "Ratelimit-Reset": str(int(reset)),
+        }
+
+    def _load_replay(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                query = tuple(sorted(tuple(item) for item in entry["query"]))
+                self._replay[(entry["method"], entry["path"], query)] = entry
+
+    async def _proxy(self, request: web.Request, key: Tuple[str, str, tuple]) -> web.Response:
+        if self._upstream is None:
+            self._upstream = aiohttp.ClientSession()
+        headers = {
+            name: request.headers[name]
+            for name in ("Client-ID", "Authorization")
+            if name in request.headers
+        }
+        async with self._upstream.request(
+            request.method, UPSTREAM_URL + request.path_qs, headers=headers
+        ) as r:
+            body = await r.json(content_type=None)
+            passthrough = {k: v for k, v in r.headers.items() if k.startswith("Ratelimit-")}
+            status = r.status
+
+        method, path, query = key
+        entry = {"method": method, "path": path, "query": query, "status": status, "body": body}
+        with open(self._record, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._replay[key] = entry
+        return web.json_response(body, status=status, headers=passthrough)
+
+    async def _close_upstream(self, app: web.Application):
+        if self._upstream is not None:
+            await self._upstream.close()
+
+    # Endpoints
+
+    async def token(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"access_token": secrets.token_hex(15), "expires_in": 5000000, "token_type": "bearer"}
+        )
+
+    @staticmethod
+    def _check_count(values: List[str], maximum: int = 100):
+        if len(values) > maximum:
+            raise web.HTTPBadRequest(text=f"Too many parameters. Maximum: {maximum}")
+
+    async def get_games(self, request: web.Request) -> web.Response:
+        ids = request.query.getall("id", [])
+        names = request.query.getall("name", [])
+        self._check_count(ids + names)
+        data = [self.games[i] for i in ids if i in self.games]
+        data += [self._game_names[n] for n in names if n in self._game_names]
+        return web.json_response({"data": data})
+
+    async def get_users(self, request: web.Request) -> web.Response:
+        ids = request.query.getall("id", [])
+        logins = request.query.getall("login", [])
+        self._check_count(ids + logins)
+        data = [self.users[i] for i in ids if i in self.users]
+        data += [self._logins[n.lower()] for n in logins if n.lower() in self._logins]
+        return web.json_response({"data": data})
+
+    async def get_streams(self, request: web.Request) -> web.Response:
+        query = request.query
+        first = int(query.get("first", 20))
+        if not 1 <= first <= 100:
+            raise web.HTTPBadRequest(text="'first' must be between 1 and 100")
+        user_ids = set(query.getall("user_id", []))
+        user_logins = set(query.getall("user_login", []))
+        game_ids = set(query.getall("game_id", []))
+        languages = set(query.getall("language", []))
+        self._check_count(list(user_ids) + list(user_logins))
+        self._check_count(list(game_ids), 10)
+
+        streams = self.streams
+        if user_ids or user_logins:
+            streams = [
+                s for s in streams if s["user_id"] in user_ids or s["user_login"] in user_logins
+            ]
+        if game_ids:
+            streams = [s for s in streams if s["game_id"] in game_ids]
+        if languages:
+            streams = [s for s in streams if s["language"] in languages]
+
+        offset = _decode_cursor(query["after"]) if "after" in query else 0
+        page = streams[offset : offset + first]
+        pagination = {}
+        if offset + first < len(streams):
+            pagination["cursor"] = _encode_cursor(offset + first)
+        return web.json_response({"data": page, "pagination": pagination})
+
+    async def webhooks_hub(self, request: web.Request) -> web.Response:
+        query = request.query
+        for name in ("hub.callback", "hub.mode", "hub.topic"):
+            if name not in query:
+                raise web.HTTPBadRequest(text=f"Missing {name}")
+        return web.Response(status=202)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Twitch Helix API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--streams", type=int, default=5000, help="number of live streams")
+    parser.add_argument("--games", type=int, default=500, help="number of games")
+    parser.add_argument("--ratelimit", type=int, default=800, help="bucket size per token")
+    parser.add_argument("--period", type=float, default=60.0, help="bucket refill period")
+    parser.add_argument("--latency", type=float, default=0.0, help="added latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 503s")
+    parser.add_argument("--replay", help="JSON lines file with recorded responses")
+    parser.add_argument("--record", help="proxy to the real API and record to this file")
+    args = parser.parse_args()
+
+    helix = FakeHelix(
+        streams=args.streams,
+        games=args.games,
+        ratelimit=args.ratelimit,
+        period=args.period,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        replay=args.replay,
+        record=args.record,
+    )
+    web.run_app(helix.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+"""Client behaviour against the local fake Helix server in ``benchmarks/fake_helix.py``."""
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from fake_helix import FakeHelix, _decode_cursor, _encode_cursor  # noqa: E402
+from twitch import Client, DeadlineExceeded, GameCatalog, Priority  # noqa: E402
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@asynccontextmanager
+async def serve(client_options=None, **helix_options):
+    helix = FakeHelix(**helix_options)
+    runner = await helix.start()
+    url = f"http://127.0.0.1:{helix.port}"
+    client = Client(
+        "test",
+        "secret",
+        base_url=f"{url}/helix",
+        token_url=f"{url}/oauth2/token",
+        **(client_options or {}),
+    )
+    try:
+        yield helix, client
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+@pytest.mark.parametrize("offset", [0, 1, 99, 100, 12345])
+def test_cursor_is_unpadded(offset):
+    cursor = _encode_cursor(offset)
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == offset
+
+
+@pytest.mark.parametrize("count, requests", [(250, 3), (200, 2)])
+def test_pagination_ends(count, requests):
+    async def main():
+        async with serve(streams=count) as (helix, client):
+            streams = await client.get_streams(limit=None).flatten()
+            assert len(streams) == count
+            # The last page of exactly 100 streams carries no cursor and ends the walk.
+            assert helix.requests == requests
+
+    run(main())
+
+
+def test_snapshot_drops_streams_shifted_across_pages():
+    async def main():
+        async with serve(streams=300) as (helix, client):
+            iterator = client.get_streams(limit=None, snapshot=True)
+            ids = []
+            async for page in iterator.pages():
+                if not ids:
+                    # A new stream at the top pushes the last stream of page one onto
+                    # page two.
+                    new = dict(helix.streams[0], id="1", user_id="1", viewer_count=10 ** 9)
+                    helix.streams.insert(0, new)
+                ids.extend(stream.id for stream in page)
+            assert len(ids) == len(set(ids)) == 300
+            assert iterator.duplicates == 1
+
+    run(main())
+
+
+@pytest.mark.parametrize(
+    "shards, reconcile", [(None, False), ([{"languages": ["en"]}, {"languages": ["de"]}], True)]
+)
+def test_crawl_returns_every_stream_once(shards, reconcile):
+    async def main():
+        async with serve(streams=1000) as (helix, client):
+            crawler = client.crawl_streams(shards, concurrency=4, reconcile=reconcile)
+            ids = [stream.id for stream in await crawler.flatten()]
+            assert sorted(ids) == sorted(stream["id"] for stream in helix.streams)
+            if reconcile:
+                missed = [s for s in helix.streams if s["language"] not in ("en", "de")]
+                assert crawler.reconciled == len(missed)
+
+    run(main())
+
+
+def test_catalog_games_are_not_packed_with_unknown_ones(tmp_path):
+    async def main():
+        options = {"game_catalog": str(tmp_path / "games.db")}
+        async with serve(options) as (helix, client):
+            game_ids = list(helix.games)[:150]
+            await client.get_games(ids=game_ids[25:125]).flatten()
+            assert helix.requests == 1
+            games = await client.get_games(ids=game_ids).flatten()
+            assert sorted(game.id for game in games) == sorted(game_ids)
+            # The 50 unknown games, on both sides of the stored ones, fit in one request.
+            assert helix.requests == 2
+
+    run(main())
+
+
+def test_response_cache_is_consulted_before_the_catalog(tmp_path):
+    async def main():
+        catalog = GameCatalog(str(tmp_path / "games.db"))
+        try:
+            async with serve({"game_catalog": catalog, "cache": True}) as (helix, client):
+                game_id = next(iter(helix.games))
+                await client.http.get_games(game_ids=[game_id])
+                assert (catalog.hits, catalog.misses) == (0, 1)
+                assert len(catalog) == 1
+                await client.http.get_games(game_ids=[game_id])
+                assert (catalog.hits, catalog.misses) == (0, 1)
+                assert helix.requests == 1
+        finally:
+            catalog.close()
+
+    run(main())
+
+
+def test_close_stops_the_refresh_of_a_shared_catalog(tmp_path):
+    async def main():
+        catalog = GameCatalog(str(tmp_path / "games.db"), refresh_after=0, refresh_interval=0.05)
+        try:
+            async with serve({"game_catalog": catalog}) as (helix, client):
+                game_ids = list(helix.games)[:300]
+                catalog.store(helix.games[game_id] for game_id in game_ids)
+                await client.get_games(ids=game_ids).flatten()
+                await asyncio.sleep(0.01)
+                await client.close()
+                requests = helix.requests
+                await asyncio.sleep(0.2)
+                assert helix.requests == requests
+                assert catalog.stale
+                with pytest.raises(RuntimeError):
+                    await client.http.get_streams()
+        finally:
+            catalog.close()
+
+    run(main())
+
+
+def test_identical_requests_are_coalesced():
+    async def main():
+        async with serve(latency=0.05) as (helix, client):
+            first, second = await asyncio.gather(
+                client.http.get_streams(first=10), client.http.get_streams(first=10)
+            )
+            assert first == second
+            assert helix.requests == 1
+            assert client.http.coalesced == 1
+
+    run(main())
+
+
+@pytest.mark.parametrize(
+    "first, second, requests",
+    [
+        (Priority.INTERACTIVE, Priority.BULK, 1),
+        (Priority.BULK, Priority.BULK, 1),
+        (Priority.BULK, Priority.INTERACTIVE, 2),
+    ],
+)
+def test_requests_join_only_as_urgent_ones(first, second, requests):
+    async def main():
+        async with serve(latency=0.05) as (helix, client):
+            await asyncio.gather(
+                client.http.get_streams(first=10, priority=first),
+                client.http.get_streams(first=10, priority=second),
+            )
+            assert helix.requests == requests
+            assert client.http.coalesced == 2 - requests
+
+    run(main())
+
+
+def test_cached_lookups_skip_the_network():
+    async def main():
+        async with serve(client_options={"cache": True}) as (helix, client):
+            user_ids = list(helix.users)[:3]
+            await client.http.get_users(user_ids=user_ids[:2])
+            resp = await client.http.get_users(user_ids=user_ids)
+            assert sorted(user["id"] for user in resp["data"]) == sorted(user_ids)
+            # Only the third user was requested the second time.
+            assert helix.requests == 2
+            assert client.http.cache.users.hits == 2
+
+    run(main())
+
+
+@pytest.mark.parametrize("client_options", [{}, {"cache": True}, {"batch_lookups": False}])
+def test_deadline_bounds_lookups(client_options):
+    async def main():
+        async with serve(client_options, latency=0.5) as (helix, client):
+            user_id = next(iter(helix.users))
+            with pytest.raises(DeadlineExceeded):
+                await client.http.get_users(user_ids=[user_id], deadline=0.1)
+            with pytest.raises(DeadlineExceeded):
+                await client.get_user(user_id, deadline=0.1)
+            with pytest.raises(DeadlineExceeded):
+                await client.http.get_streams(first=1, deadline=0.1)
+            assert (await client.get_user(user_id, deadline=5)).id == user_id
+
+    run(main())
+
+
+def test_hooks_observe_the_request():
+    async def main():
+        async with serve() as (helix, client):
+            events = []
+
+            def on_response(route, status, network, parse, remaining):
+                events.append(status)
+
+            client.http.add_hook("request_start", lambda route: events.append("start"))
+            client.http.add_hook("response", on_response)
+            client.http.add_hook("request_end", lambda route, elapsed, error: events.append(error))
+            await client.http.get_streams(first=5)
+            assert events == ["start", 200, None]
+
+            client.http.remove_hook("response", on_response)
+            events.clear()
+            await client.http.get_streams(first=6)
+            assert events == ["start", None]
+
+    run(main())
@@ -0,0 +1,142 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+"""Batching of single-key lookups by :class:`BatchLoader`."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from twitch import BatchLoader, HTTPException  # noqa: E402
+
+
+class Model:
+    def __init__(self, id: str):
+        self.id = id
+
+
+class Response:
+    status = 400
+
+
+class Fetcher:
+    """Records the batches it is called with. Keys starting with ``missing`` are not
+    found and keys starting with ``bad`` make the whole batch fail with status 400."""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.delay = delay
+        self.error = error
+        self.batches = []
+
+    async def __call__(self, keys):
+        self.batches.append(list(keys))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        if any(key.startswith("bad") for key in keys):
+            raise HTTPException(Response(), None, "Malformed key")
+        return [Model(key) for key in keys if not key.startswith("missing")]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def ids(models):
+    return [None if model is None else model.id for model in models]
+
+
+def test_loads_in_one_iteration_share_a_batch():
+    async def main():
+        fetch = Fetcher()
+        loader = BatchLoader(fetch)
+        models = await asyncio.gather(*(loader.load(key) for key in ("1", "2", "missing")))
+        assert ids(models) == ["1", "2", None]
+        assert fetch.batches == [["1", "2", "missing"]]
+        assert (loader.loads, loader.batches) == (3, 1)
+
+    run(main())
+
+
+def test_full_batches_are_sent_early():
+    async def main():
+        fetch = Fetcher()
+        loader = BatchLoader(fetch, max_batch=2)
+        models = await asyncio.gather(*(loader.load(str(i)) for i in range(5)))
+        assert ids(models) == ["0", "1", "2", "3", "4"]
+        assert fetch.batches == [["0", "1"], ["2", "3"], ["4"]]
+
+    run(main())
+
+
+def test_duplicate_keys_are_fetched_once():
+    async def main():
+        fetch = Fetcher(delay=0.05)
+        loader = BatchLoader(fetch)
+        first = asyncio.ensure_future(loader.load("1"))
+        await asyncio.sleep(0.01)
+        # Joins the batch in flight instead of sending the key again.
+        second = await asyncio.gather(loader.load("1"), loader.load("1"))
+        assert ids([await first] + second) == ["1", "1", "1"]
+        assert fetch.batches == [["1"]]
+
+    run(main())
+
+
+def test_keys_are_normalized():
+    async def main():
+        async def fetch(logins):
+            # The API answers with the canonical spelling.
+            return [Model(login.lower()) for login in logins]
+
+        loader = BatchLoader(fetch, normalize=str.lower)
+        assert (await loader.load("ABC")).id == "abc"
+        assert await BatchLoader(fetch).load("ABC") is None
+
+    run(main())
+
+
+def test_errors_reach_every_caller():
+    async def main():
+        loader = BatchLoader(Fetcher(error=RuntimeError("down")))
+        results = await asyncio.gather(loader.load("1"), loader.load("2"), return_exceptions=True)
+        assert [str(result) for result in results] == ["down", "down"]
+        # A failed key is not remembered.
+        loader.fetch = Fetcher()
+        assert (await loader.load("1")).id == "1"
+
+    run(main())
+
+
+def test_rejected_batches_are_split_to_isolate_bad_keys():
+    async def main():
+        fetch = Fetcher()
+        loader = BatchLoader(fetch)
+        keys = ["1", "2", "bad", "3"]
+        results = await asyncio.gather(*(loader.load(key) for key in keys), return_exceptions=True)
+        assert ids(results[:2]) == ["1", "2"]
+        assert isinstance(results[2], HTTPException)
+        assert results[3].id == "3"
+        assert fetch.batches[0] == keys
+        assert ["bad"] in fetch.batches
+
+    run(main())
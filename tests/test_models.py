@@ -0,0 +1,85 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+"""Eager and lazy decoding of the models."""
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from twitch import Game, Stream, User  # noqa: E402
+
+PAYLOADS = {
+    Stream: {
+        "id": "40000000001",
+        "user_id": "100001",
+        "user_name": "Streamer1",
+        "game_id": "1001",
+        "type": "live",
+        "title": "Stream number 1",
+        "viewer_count": 42,
+        "started_at": "2020-11-08T12:34:56Z",
+        "language": "en",
+        "thumbnail_url": "https://static-cdn.jtvnw.net/previews-ttv/s1-{width}x{height}.jpg",
+        "tag_ids": [],
+    },
+    User: {
+        "id": "100001",
+        "login": "streamer1",
+        "display_name": "Streamer1",
+        "type": "",
+        "broadcaster_type": "partner",
+        "description": "",
+        "profile_image_url": "https://static-cdn.jtvnw.net/u/100001.png",
+        "offline_image_url": "",
+        "view_count": 10,
+    },
+    Game: {
+        "id": "1001",
+        "name": "Game 1",
+        "box_art_url": "https://static-cdn.jtvnw.net/ttv-boxart/1001-{width}x{height}.jpg",
+    },
+}
+
+
+class FakeClient:
+    def __init__(self, lazy_models: bool):
+        self.lazy_models = lazy_models
+
+
+def attributes(model) -> dict:
+    return {name: getattr(model, name) for name in model._decoders}
+
+
+@pytest.mark.parametrize("cls", list(PAYLOADS))
+def test_lazy_models_decode_like_eager_ones(cls):
+    payload = PAYLOADS[cls]
+    eager = cls(FakeClient(False), payload)
+    lazy = cls(FakeClient(True), payload)
+    assert attributes(lazy) == attributes(eager)
+
+
+@pytest.mark.parametrize("lazy_models", [False, True])
+def test_update_replaces_decoded_attributes(lazy_models):
+    stream = Stream(FakeClient(lazy_models), PAYLOADS[Stream])
+    assert stream.viewer_count == 42
+    stream._update(dict(PAYLOADS[Stream], viewer_count=7, type=""))
+    assert stream.viewer_count == 7
+    assert not stream.live
@@ -0,0 +1,61 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+"""Packing of lookup keys into requests by :func:`plan_requests`."""
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from twitch.planner import MAX_LOOKUP_PARAMS, plan_requests  # noqa: E402
+
+
+def ids(start: int, stop: int):
+    return [str(i) for i in range(start, stop)]
+
+
+def test_mixed_keys_share_requests():
+    requests = plan_requests([("id", ids(0, 150), str), ("login", ids(150, 210), str.lower)])
+    assert [tuple(map(len, request)) for request in requests] == [(100, 0), (50, 50), (0, 10)]
+    assert requests[1] == (ids(100, 150), ids(150, 200))
+
+
+def test_keys_are_deduplicated_after_normalization():
+    requests = plan_requests([("id", ["1", "1"], str), ("login", ["Foo", "foo", "bar"], str.lower)])
+    # The first spelling of a key is the one requested.
+    assert requests == [(["1"], ["Foo", "bar"])]
+
+
+def test_known_keys_are_packed_first_and_apart():
+    known = {("id", key) for key in ids(25, 125)}
+    requests = plan_requests([("id", ids(0, 150), str)], lambda param, key: (param, key) in known)
+    assert requests == [(ids(25, 125),), (ids(0, 25) + ids(125, 150),)]
+
+
+@pytest.mark.parametrize("count, expected", [(0, 0), (1, 1), (100, 1), (101, 2), (250, 3)])
+def test_unknown_keys_take_the_fewest_requests(count, expected):
+    requests = plan_requests([("id", ids(0, count), str)])
+    assert len(requests) == expected
+    assert all(len(request[0]) <= MAX_LOOKUP_PARAMS for request in requests)
+
+
+def test_custom_limit():
+    requests = plan_requests([("id", ids(0, 5), str), ("name", ["a"], str)], limit=2)
+    assert requests == [(["0", "1"], []), (["2", "3"], []), (["4"], ["a"])]
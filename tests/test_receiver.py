@@ -0,0 +1,94 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+"""Signature checks of :class:`WebhookReceiver`."""
+import asyncio
+import hashlib
+import hmac
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+from twitch import Client, Subscription, UserFollows  # noqa: E402
+
+SECRET = "s3cret"
+BODY = json.dumps({"data": [{"from_id": "1", "to_id": "2"}]}).encode()
+
+
+def sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def deliver(headers: dict, body: bytes = BODY, secret: str = SECRET):
+    """Posts one notification to a fresh receiver. Returns the response status, the
+    notifications the handler got and the receiver."""
+    headers = dict(headers)
+
+    async def main():
+        client = Client("test", "secret")
+        receiver = client.create_webhook_receiver(workers=1)
+        topic = UserFollows(to_id="2")
+        received = []
+        receiver.add(Subscription(client, "https://example.com", topic, 0, secret), received.append)
+        headers.setdefault(
+            "Link",
+            f'<https://api.twitch.tv/helix/webhooks/hub>; rel="hub", <{topic.uri}>; rel="self"',
+        )
+        async with TestClient(TestServer(receiver.make_app())) as http:
+            resp = await http.post(receiver.path, data=body, headers=headers)
+            await receiver._queue.join()
+        await client.close()
+        return resp.status, received, receiver
+
+    return asyncio.run(main())
+
+
+def test_valid_signature_is_accepted():
+    status, received, receiver = deliver({"X-Hub-Signature": sign(BODY)})
+    assert status == 200
+    assert [n.data for n in received] == [[{"from_id": "1", "to_id": "2"}]]
+    assert (receiver.received, receiver.rejected) == (1, 0)
+
+
+@pytest.mark.parametrize(
+    "headers, body",
+    [
+        ({"X-Hub-Signature": sign(BODY)}, BODY.replace(b'"1"', b'"3"')),
+        ({"X-Hub-Signature": sign(BODY, "other")}, BODY),
+        ({"X-Hub-Signature": sign(BODY)[:-1] + "é"}, BODY),
+        ({}, BODY),
+    ],
+    ids=["tampered body", "wrong secret", "non-ASCII signature", "missing signature"],
+)
+def test_invalid_signature_is_rejected(headers, body):
+    status, received, receiver = deliver(headers, body)
+    assert status == 403
+    assert received == []
+    assert (receiver.received, receiver.rejected) == (0, 1)
+
+
+def test_signature_is_not_required_without_secret():
+    status, received, _ = deliver({}, secret=None)
+    assert status == 200
+    assert len(received) == 1
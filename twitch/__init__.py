@@ -4,11 +4,23 @@ __license__ = "MIT"
 __copyright__ = "Copyright 2020 Fozar"
 __version__ = "0.2.1"
 
+from .cache import *
+from .catalog import *
 from .client import Client
+from .columnar import *
+from .crawler import *
 from .errors import *
 from .game import Game
+from .identity import *
 from .stream import Stream
 from .user import User
 from .iterators import *
+from .loader import *
+from .metrics import *
+from .planner import *
+from .ratelimit import *
+from .receiver import *
+from .retry import *
 from .utils import *
+from .watcher import *
 from .webhook import *
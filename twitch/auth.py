@@ -0,0 +1,227 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import asyncio
+import json
+import os
+import time
+from contextlib import suppress
+from typing import Optional, TYPE_CHECKING
+
+from .errors import HTTPException
+from .ratelimit import Priority, RateLimiter
+
+if TYPE_CHECKING:
+    from .http import HTTPClient
+
+__all__ = ("Credential", "TokenManager")
+
+
+class TokenManager:
+    """Manages an app access token obtained with the client credentials flow.
+
+    Concurrent callers share a single in-flight token request. The token is refreshed
+    in the background shortly before it expires and can optionally be persisted to a
+    file, so a restarted process reuses it instead of requesting a new one.
+
+    Attributes
+    -----------
+    client_id : str
+        Application client ID.
+    cache_path : Optional[str]
+        File the token is persisted to, readable by the owner only. ``None`` disables
+        persistence.
+    refresh_margin : float
+        Seconds before expiry at which the token is refreshed.
+    token : Optional[str]
+        Current access token.
+    expires_at : Optional[float]
+        UNIX timestamp at which the current token expires.
+
+    """
+
+    TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+
+    def __init__(
+        self,
+        http: "HTTPClient",
+        client_id: str,
+        client_secret: Optional[str],
+        cache_path: Optional[str] = None,
+        refresh_margin: float = 300.0,
+    ):
+        self._http = http
+        self.client_id = client_id
+        self._client_secret = client_secret
+        self.cache_path = cache_path
+        self.refresh_margin = refresh_margin
+        self.token = None
+        self.expires_at = None
+        self._fetching = None
+        self._refresh_task = None
+        if cache_path:
+            self._load()
+
+    @property
+    def valid(self) -> bool:
+        """True if there is a token and it has not expired yet."""
+        return self.token is not None and (self.expires_at is None or self.expires_at > time.time())
+
+    async def get(self) -> str:
+        """Returns a valid access token, requesting a new one if needed."""
+        if self.valid:
+            if self._refresh_task is None and self._fetching is None:
+                # A token loaded from the cache has no refresh scheduled yet.
+                self._schedule_refresh()
+            return self.token
+        return await self.refresh()
+
+    def invalidate(self, token: str):
+        """Forgets ``token`` after it has been rejected by the API. A token that has
+        already been replaced is left alone, so a burst of rejected requests only
+        causes one refresh."""
+        if token == self.token:
+            self.token = None
+            self.expires_at = None
+
+    async def refresh(self) -> str:
+        """Requests a new access token. Concurrent calls share the same request."""
+        if self._fetching is None:
+            self._fetching = asyncio.ensure_future(self._fetch())
+            self._fetching.add_done_callback(self._fetch_done)
+        return await asyncio.shield(self._fetching)
+
+    def _fetch_done(self, future: asyncio.Future):
+        self._fetching = None
+        if not future.cancelled():
+            # Retrieve the exception so it is not reported as never retrieved.
+            future.exception()
+
+    async def _fetch(self) -> str:
+        async with self._http._get_session().post(
+            self._http.token_url,
+            params={
+                "client_id": self.client_id,
+                "client_secret": self._client_secret,
+                "grant_type": "client_credentials",
+            },
+        ) as r:
+            data = await r.json()
+            if r.status != 200:
+                raise HTTPException(r, data, data.get("message", ""))
+
+        self.token = data["access_token"]
+        expires_in = data.get("expires_in")
+        self.expires_at = time.time() + expires_in if expires_in else None
+        self._save()
+        self._schedule_refresh()
+        if self._http._hooks:
+            self._http._dispatch("token_refresh", self.client_id)
+        return self.token
+
+    def _schedule_refresh(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self.expires_at is None:
+            return
+        delay = max(0.0, self.expires_at - time.time() - self.refresh_margin)
+        self._refresh_task = asyncio.ensure_future(self._refresh_later(delay))
+
+    async def _refresh_later(self, delay: float):
+        await asyncio.sleep(delay)
+        self._refresh_task = None
+        with suppress(Exception):
+            await self.refresh()
+
+    def close(self):
+        """Stops the background refresh."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    def _load(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("client_id") != self.client_id:
+            return
+        expires_at = data.get("expires_at")
+        if expires_at is not None and expires_at - self.refresh_margin <= time.time():
+            return
+        self.token = data.get("access_token")
+        self.expires_at = expires_at
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        data = {
+            "client_id": self.client_id,
+            "access_token": self.token,
+            "expires_at": self.expires_at,
+        }
+        tmp_path = f"{self.cache_path}.tmp"
+        with suppress(OSError):
+            # The token is a secret: readable by the owner only. A stale temporary file
+            # would keep its own mode, so it is replaced rather than truncated.
+            with suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+
+
+class Credential:
+    """Application credentials with their own access token and rate limit bucket.
+
+    Attributes
+    -----------
+    client_id : str
+        Application client ID.
+    tokens : :class:`TokenManager`
+        Manager of the app access token.
+    ratelimiter : :class:`RateLimiter`
+        Rate limit bucket of the token.
+
+    """
+
+    __slots__ = ("client_id", "tokens", "ratelimiter")
+
+    def __init__(
+        self,
+        http: "HTTPClient",
+        client_id: str,
+        client_secret: Optional[str],
+        token_cache: Optional[str] = None,
+    ):
+        self.client_id = client_id
+        self.tokens = TokenManager(http, client_id, client_secret, token_cache)
+        self.ratelimiter = RateLimiter()
+
+    def __repr__(self):
+        return f"<Credential client_id={self.client_id!r}>"
+
+    def _rank(self, priority: Priority):
+        # Sooner admission first, then more remaining budget.
+        return self.ratelimiter.delay(priority), -self.ratelimiter.tokens
@@ -0,0 +1,126 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+__all__ = ("TTLCache", "ResponseCache")
+
+MISSING = object()
+NOT_FOUND = object()
+
+
+class TTLCache:
+    """Mapping with least recently used eviction and per-entry expiry.
+
+    Besides values it remembers keys that are known not to exist (negative entries),
+    which expire after ``negative_ttl`` seconds.
+
+    .. container:: operations
+        .. describe:: key in x
+            Checks if an unexpired entry exists, without counting a hit or miss.
+
+    Attributes
+    -----------
+    maxsize : int
+        Maximum number of entries, positive and negative. The least recently used
+        entry is evicted first.
+    ttl : float
+        Seconds a value stays valid.
+    negative_ttl : float
+        Seconds a negative entry stays valid.
+    hits : int
+        Lookups answered by the cache, including negative entries.
+    misses : int
+        Lookups that were not in the cache or had expired.
+
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600.0, negative_ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # Does not count as a lookup nor refresh the entry's recency.
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached value, :data:`NOT_FOUND` for a negative entry or
+        :data:`MISSING` if the key is not cached."""
+        entry = self._data.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return MISSING
+
+    def set(self, key: Hashable, value: Any):
+        self._put(key, value, self.ttl)
+
+    def set_missing(self, key: Hashable):
+        """Remembers that ``key`` does not exist."""
+        self._put(key, NOT_FOUND, self.negative_ttl)
+
+    def _put(self, key: Hashable, value: Any, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+class ResponseCache:
+    """Caches entries of ``/games`` and ``/users`` responses by the keys they can be
+    looked up with, so repeated lookups do not reach the API.
+
+    Attributes
+    -----------
+    games : :class:`TTLCache`
+        Game entries keyed by ID and by name.
+    users : :class:`TTLCache`
+        User entries keyed by ID and by lowercase login.
+
+    """
+
+    def __init__(
+        self,
+        games_ttl: float = 86400.0,
+        users_ttl: float = 3600.0,
+        negative_ttl: float = 300.0,
+        maxsize: int = 10000,
+    ):
+        self.games = TTLCache(maxsize, games_ttl, negative_ttl)
+        self.users = TTLCache(maxsize, users_ttl, negative_ttl)
@@ -0,0 +1,226 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+__all__ = ("GameCatalog",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_name ON games (name);
+"""
+
+
+class GameCatalog:
+    """Persistent store of ``/games`` entries in an SQLite database, keyed by ID and by
+    exact name, so a restarted process can answer game lookups without the API.
+
+    Entries older than ``refresh_after`` are still returned, and are queued for a
+    background refresh that sends one request of up to 100 IDs every
+    ``refresh_interval`` seconds at :attr:`Priority.BULK`, so even a catalog that is
+    entirely stale does not cause a burst of requests. Entries older than ``max_age``
+    are treated as missing. Games that no longer exist are removed on refresh.
+
+    The database uses write-ahead logging, so several processes can share one file.
+    The client accesses it through :meth:`run_in_executor`, in a thread of the
+    catalog, so disk I/O does not block the event loop.
+    The IDs and names it holds are also indexed in memory, so :meth:`known` does not
+    touch the disk; entries another process adds are not indexed.
+
+    .. container:: operations
+        .. describe:: len(x)
+            Returns the number of stored games.
+
+    Attributes
+    -----------
+    path : str
+        Path of the database file.
+    refresh_after : float
+        Age in seconds after which an entry is refreshed. Defaults to one day.
+    max_age : float
+        Age in seconds after which an entry is not returned anymore. Defaults to 30
+        days.
+    refresh_interval : float
+        Seconds between background refresh requests. Defaults to 1.
+    stale : Set[str]
+        IDs of returned entries waiting for a refresh.
+    hits : int
+        Requested IDs and names answered by the catalog.
+    misses : int
+        Requested IDs and names that were not stored or too old.
+
+    """
+
+    def __init__(
+        self,
+        path: str,
+        refresh_after: float = 86400.0,
+        max_age: float = 30 * 86400.0,
+        refresh_interval: float = 1.0,
+    ):
+        self.path = path
+        self.refresh_after = refresh_after
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self.stale = set()
+        self.hits = 0
+        self.misses = 0
+        self._refresh_task = None
+        self._refresh_fetch = None
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="GameCatalog")
+        self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        # (column, key) -> (fetched_at, name) of the stored games.
+        self._index = {}
+        for game_id, name, fetched_at in self._db.execute("SELECT id, name, fetched_at FROM games"):
+            self._index[("id", game_id)] = self._index[("name", name)] = (fetched_at, name)
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def run_in_executor(self, func: Callable[..., Any], *args) -> Awaitable[Any]:
+        """Runs a method of the catalog, e.g. :meth:`lookup`, in the catalog's
+        database thread."""
+        return asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    def known(self, column: str, key: str) -> bool:
+        """Whether a game is stored by ``column`` (``"id"`` or ``"name"``) and young
+        enough to be returned by :meth:`lookup`."""
+        entry = self._index.get((column, key))
+        return entry is not None and time.time() - entry[0] <= self.max_age
+
+    def lookup(
+        self, ids: Optional[Iterable[str]] = None, names: Optional[Iterable[str]] = None
+    ) -> Tuple[Dict[str, dict], List[str], List[str]]:
+        """Looks games up by ID and by name.
+
+        Returns
+        -------
+        Tuple[Dict[str, dict], List[str], List[str]]
+            Found entries keyed by ID, and the IDs and names that were not found.
+        """
+        now = time.time()
+        found = {}
+        missing = {"id": [], "name": []}
+        for column, keys in (("id", ids), ("name", names)):
+            keys = list(dict.fromkeys(keys or ()))
+            rows = {}
+            # Stay well below SQLite's limit of host parameters per statement.
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                marks = ",".join("?" * len(chunk))
+                query = f"SELECT {column}, id, data, fetched_at FROM games WHERE {column} IN "
+                for key, game_id, data, fetched_at in self._db.execute(f"{query}({marks})", chunk):
+                    rows[key] = game_id, data, fetched_at
+            for key in keys:
+                row = rows.get(key)
+                if row is None or now - row[2] > self.max_age:
+                    self.misses += 1
+                    missing[column].append(key)
+                    continue
+                self.hits += 1
+                game_id, data, fetched_at = row
+                if now - fetched_at > self.refresh_after:
+                    self.stale.add(game_id)
+                found[game_id] = json.loads(data)
+        return found, missing["id"], missing["name"]
+
+    def store(self, entries: Iterable[dict]):
+        """Stores ``/games`` entries, replacing older versions."""
+        now = time.time()
+        rows = [(e["id"], e["name"], json.dumps(e), now) for e in entries]
+        if not rows:
+            return
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?)", rows)
+        for game_id, name, _, fetched_at in rows:
+            previous = self._index.get(("id", game_id))
+            if previous is not None and previous[1] != name:
+                self._index.pop(("name", previous[1]), None)
+            self._index[("id", game_id)] = self._index[("name", name)] = (fetched_at, name)
+        self.stale.difference_update(row[0] for row in rows)
+
+    def remove(self, ids: Iterable[str]):
+        """Removes games by ID."""
+        ids = [(game_id,) for game_id in ids]
+        if ids:
+            with self._db:
+                self._db.executemany("DELETE FROM games WHERE id = ?", ids)
+        for (game_id,) in ids:
+            entry = self._index.pop(("id", game_id), None)
+            if entry is not None:
+                self._index.pop(("name", entry[1]), None)
+
+    def refresh_stale(self, fetch: Callable[[List[str]], Awaitable[dict]]):
+        """Starts refreshing :attr:`stale` entries in the background with ``fetch``,
+        which requests ``/games`` by a list of IDs. Does nothing if a refresh is
+        already running."""
+        if self.stale and self._refresh_task is None:
+            self._refresh_fetch = fetch
+            self._refresh_task = asyncio.ensure_future(self._refresh(fetch))
+
+    def stop_refresh(self, fetch: Optional[Callable[[List[str]], Awaitable[dict]]] = None):
+        """Stops the background refresh. If ``fetch`` is given, only a refresh started
+        with it is stopped, so a client does not stop the refresh of another one."""
+        if self._refresh_task is not None and fetch in (None, self._refresh_fetch):
+            self._refresh_task.cancel()
+            self._refresh_task = None
+            self._refresh_fetch = None
+
+    async def _refresh(self, fetch: Callable[[List[str]], Awaitable[dict]]):
+        try:
+            while self.stale:
+                ids = [self.stale.pop() for _ in range(min(100, len(self.stale)))]
+                try:
+                    resp = await fetch(ids)
+                except asyncio.CancelledError:
+                    self.stale.update(ids)
+                    raise
+                except Exception:
+                    # Stale entries keep being served; the next lookup retries.
+                    self.stale.update(ids)
+                    return
+                await self.run_in_executor(self.store, resp["data"])
+                removed = set(ids).difference(e["id"] for e in resp["data"])
+                await self.run_in_executor(self.remove, removed)
+                await asyncio.sleep(self.refresh_interval)
+        finally:
+            if self._refresh_task is asyncio.current_task():
+                self._refresh_task = None
+                self._refresh_fetch = None
+
+    def close(self):
+        """Stops the background refresh and closes the database."""
+        self.stop_refresh()
+        self._executor.shutdown()
+        self._db.close()
@@ -1,23 +1,181 @@
+import asyncio
+import time
 from contextlib import suppress
-from typing import List, Optional
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Union
 
-from .errors import NoMoreItems
+from .crawler import StreamCrawler
+from .errors import DeadlineExceeded, NoMoreItems
 from .game import Game
 from .http import HTTPClient
+from .identity import IdentityMap
 from .iterators import GameIterator, UserIterator, StreamIterator
+from .loader import BatchLoader
+from .ratelimit import Priority
+from .receiver import WebhookReceiver
 from .stream import Stream
 from .user import User
+from .watcher import StreamWatcher
 from .webhook import *
 
 
+async def _with_deadline(aw, deadline: Optional[float]):
+    # The lookup may wait on a batch or a request shared with other callers, which
+    # cancelling it leaves running.
+    if deadline is None:
+        return await aw
+    expires = time.monotonic() + deadline
+    try:
+        return await asyncio.wait_for(aw, deadline)
+    except asyncio.TimeoutError:
+        if time.monotonic() < expires:
+            raise
+        raise DeadlineExceeded(f"Deadline of {deadline}s exceeded") from None
+
+
 class Client:
+    """Twitch API client
+
+    .. container:: operations
+        .. describe:: async with x
+            Returns the client and closes it on exit.
+
+    Parameters
+    ----------
+    client_id : str
+        Application client ID.
+    client_secret : Optional[str]
+        Application client secret. Used to obtain an app access token.
+    lazy_models : bool
+        Makes :class:`Stream`, :class:`User` and :class:`Game` keep the raw payload
+        and decode each attribute on first access. Speeds up large crawls that read
+        only a few attributes. Defaults to ``False``.
+    identity_map : Union[:class:`IdentityMap`, bool]
+        Keeps one object per user, game and stream ID, available as
+        ``client.identity_map``. Payloads of known entities update the existing object
+        instead of creating a new one. ``True`` creates a map holding up to 10000 objects.
+        Defaults to ``False``.
+    batch_lookups : bool
+        Makes concurrent :meth:`get_user`, :meth:`get_game` and :meth:`get_stream` calls
+        share requests: single lookups made close together are sent as one request of
+        up to 100 keys per endpoint. Streams are batched by user ID only. Defaults to
+        ``True``.
+    batch_window : float
+        Seconds a batch waits for more lookups. Defaults to 0, which batches the
+        lookups made within one event loop iteration.
+    session : Optional[:class:`aiohttp.ClientSession`]
+        Session to send requests with. It is not closed by :meth:`close`. By default a
+        session is created on the running event loop on first use.
+    connector : Optional[:class:`aiohttp.BaseConnector`]
+        Connector for the default session. Overrides the connection pool settings below.
+    limit : int
+        Total number of simultaneous connections. Defaults to 100.
+    limit_per_host : int
+        Number of simultaneous connections to one host. Defaults to 0 (no limit).
+    keepalive_timeout : float
+        Seconds to keep idle connections open for reuse. Defaults to 15.
+    ttl_dns_cache : Optional[int]
+        Seconds to cache resolved DNS entries. ``None`` caches forever. Defaults to 10.
+    timeout : Optional[:class:`aiohttp.ClientTimeout`]
+        Timeout settings for the default session.
+    token_cache : Optional[str]
+        Path of a file to persist the app access token to. A restarted client reuses
+        the cached token until it expires instead of requesting a new one.
+    json_loads : Union[str, Callable[[bytes], Any], None]
+        JSON decoder applied to raw response bodies, or the name of a module providing
+        one, e.g. ``"orjson"`` or ``"ujson"``. Falls back to :func:`json.loads` if the
+        module is not installed.
+    retry_policy : Optional[:class:`RetryPolicy`]
+        Controls retries of failed requests and the default request deadline.
+    circuit_breaker : Union[:class:`CircuitBreaker`, bool]
+        Fails requests fast while the API keeps returning server errors. ``False``
+        disables it. Defaults to a :class:`CircuitBreaker` with default settings.
+    metrics : Union[:class:`Metrics`, bool]
+        Collects request metrics into a :class:`Metrics` registry, available as
+        ``client.http.metrics``. ``True`` creates a new registry. Defaults to ``False``.
+    cache : Union[:class:`ResponseCache`, bool]
+        Caches games and users by ID, name and login, including lookups that found
+        nothing. ``True`` uses default TTLs. Defaults to ``False``.
+    game_catalog : Union[:class:`GameCatalog`, str, None]
+        Persistent store of games, or the path of an SQLite database to create one at.
+        Game lookups are answered from it first and only unknown games are requested;
+        stale entries are refreshed in the background. A catalog created from a path
+        is closed by :meth:`close`. Defaults to ``None``.
+    credentials : Optional[List[Tuple[str, Optional[str]]]]
+        Additional ``(client_id, client_secret)`` pairs. Every application has its own
+        token and rate limit bucket. Requests go to the credential with the most
+        remaining budget and fail over to another one on 401, 403 and 429 responses.
+    base_url : str
+        Root URL of the Helix API. Defaults to ``https://api.twitch.tv/helix``.
+    token_url : str
+        URL of the OAuth token endpoint. Defaults to ``https://id.twitch.tv/oauth2/token``.
+
+    """
+
     BASE_URL = "https://api.twitch.tv/helix"
 
-    def __init__(self, client_id: str, client_secret: str = None):
-        self.http = HTTPClient(client_id, client_secret)
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str = None,
+        *,
+        lazy_models: bool = False,
+        identity_map: Union[IdentityMap, bool] = False,
+        batch_lookups: bool = True,
+        batch_window: float = 0.0,
+        **options,
+    ):
+        self.lazy_models = lazy_models
+        if identity_map is True:
+            identity_map = IdentityMap()
+        elif identity_map is False:
+            identity_map = None
+        self.identity_map = identity_map
+        self.http = HTTPClient(client_id, client_secret, **options)
+        self._loaders = {}
+        if batch_lookups:
+            self._loaders = {
+                "user_id": BatchLoader(
+                    lambda ids: self.get_users(ids=ids).flatten(), window=batch_window
+                ),
+                "user_login": BatchLoader(
+                    lambda logins: self.get_users(logins=logins).flatten(),
+                    attrgetter("login"),
+                    str.lower,
+                    window=batch_window,
+                ),
+                "game_id": BatchLoader(
+                    lambda ids: self.get_games(ids=ids).flatten(), window=batch_window
+                ),
+                "game_name": BatchLoader(
+                    lambda names: self.get_games(names=names).flatten(),
+                    attrgetter("name"),
+                    window=batch_window,
+                ),
+                "stream_user_id": BatchLoader(
+                    lambda ids: self.get_streams(len(ids)).filter(user_ids=ids).flatten(),
+                    attrgetter("user_id"),
+                    window=batch_window,
+                ),
+            }
+
+    async def __aenter__(self) -> "Client":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """Closes the client and its HTTP session."""
+        await self.http.close()
 
     def get_games(
-        self, ids: Optional[List[str]] = None, names: Optional[List[str]] = None,
+        self,
+        ids: Optional[List[str]] = None,
+        names: Optional[List[str]] = None,
+        priority: Optional[Priority] = None,
+        concurrency: int = 4,
+        ordered: bool = True,
     ) -> GameIterator:
         """Gets games information by game IDs or names.
 
@@ -33,6 +191,14 @@ class Client:
             Game names. The name must be an exact match. For instance, “Pokemon” will not
             return a list of Pokemon games; instead, query the specific Pokemon game(s)
             in which you are interested.
+        priority : Optional[Priority]
+            Rate limit priority of the requests. By default lookups of up to 100 games
+            are interactive and larger ones are bulk.
+        concurrency : int
+            Maximum number of 100-game requests in flight at once. Defaults to 4.
+        ordered : bool
+            Whether games are yielded in request order. If ``False``, they are yielded
+            as responses arrive. Defaults to ``True``.
 
         Returns
         -------
@@ -40,10 +206,10 @@ class Client:
             Asynchronous iterator of found games
 
         """
-        return GameIterator(self, ids, names)
+        return GameIterator(self, ids, names, priority, concurrency, ordered)
 
     async def get_game(
-        self, id: Optional[str] = None, name: Optional[str] = None
+        self, id: Optional[str] = None, name: Optional[str] = None, deadline: Optional[float] = None
     ) -> Optional[Game]:
         """Gets game information by game ID or name.
 
@@ -55,6 +221,11 @@ class Client:
             Game name. The name must be an exact match. For instance, “Pokemon” will not
             return a list of Pokemon games; instead, query the specific Pokemon game(s)
             in which you are interested.
+        deadline : Optional[float]
+            Seconds the lookup may take, including retries and waiting for a batch.
+            :exc:`DeadlineExceeded` is raised when it runs out. Defaults to the deadline
+            of the retry policy.
+
         Returns
         -------
         Optional[Game]
@@ -63,14 +234,27 @@ class Client:
         """
         if id and name:
             raise TypeError("You must specify only ID or only name.")
+        if self._loaders:
+            if id:
+                return await _with_deadline(self._loaders["game_id"].load(id), deadline)
+            elif name:
+                return await _with_deadline(self._loaders["game_name"].load(name), deadline)
+            return None
         with suppress(NoMoreItems):
             if id:
-                return await self.get_games(ids=[id]).next()
+                return await _with_deadline(self.get_games(ids=[id]).next(), deadline)
             elif name:
-                return await self.get_games(names=[name]).next()
+                return await _with_deadline(self.get_games(names=[name]).next(), deadline)
         return None
 
-    def get_streams(self, limit: Optional[int] = 100) -> StreamIterator:
+    def get_streams(
+        self,
+        limit: Optional[int] = 100,
+        priority: Optional[Priority] = None,
+        prefetch: int = 0,
+        snapshot: bool = False,
+        reconcile: bool = False,
+    ) -> StreamIterator:
         """Gets information about active streams. Streams are returned sorted by number
         of current viewers, in descending order. Across multiple pages of results, there
         may be duplicate or missing streams, as viewers join and leave streams.
@@ -80,6 +264,22 @@ class Client:
         limit : Optional[int]
             Maximum number of objects to retrieve. If ``None`` it retrieves without
             limits.
+        priority : Optional[Priority]
+            Rate limit priority of the requests. By default up to 100 streams are
+            retrieved as interactive and more as bulk, so long crawls yield budget
+            to interactive calls.
+        prefetch : int
+            Number of pages to fetch ahead of the consumer. The next page is requested
+            as soon as the cursor of the previous one arrives. Defaults to 0 (disabled).
+        snapshot : bool
+            Drops streams that were already returned. Only stream IDs are kept in
+            memory; the number of dropped streams is available as
+            :attr:`StreamIterator.duplicates`. Defaults to ``False``.
+        reconcile : bool
+            Implies ``snapshot``. After the walk is exhausted, walks the list once more
+            and returns only streams that were missed the first time, counted in
+            :attr:`StreamIterator.reconciled`. Doubles the number of requests.
+            Defaults to ``False``.
 
         Returns
         -------
@@ -87,10 +287,76 @@ class Client:
             Asynchronous iterator of found streams
 
         """
-        return StreamIterator(self, limit)
+        return StreamIterator(self, limit, priority, prefetch, snapshot, reconcile)
+
+    def crawl_streams(
+        self,
+        shards: Optional[List[Dict[str, List[str]]]] = None,
+        concurrency: int = 8,
+        prefetch: int = 1,
+        reconcile: bool = False,
+    ) -> StreamCrawler:
+        """Gets all active streams by walking several filtered shards of the stream list
+        concurrently. Each stream is returned once, in no particular order.
+
+        Parameters
+        ----------
+        shards : Optional[List[Dict[str, List[str]]]]
+            Filters of the shards, as keyword arguments of
+            :meth:`StreamIterator.filter`, e.g. ``[{"languages": ["en"]}, ...]``.
+            Streams matching no shard are not returned without ``reconcile``. Defaults
+            to one shard per language in :data:`LANGUAGES`.
+        concurrency : int
+            Maximum number of shards walked at once. Defaults to 8.
+        prefetch : int
+            Number of pages each shard fetches ahead. Defaults to 1.
+        reconcile : bool
+            Walks all streams once more after the shards and returns the ones they
+            missed, e.g. in languages no shard lists. Doubles the number of requests.
+            Defaults to ``False``.
+
+        Returns
+        -------
+        StreamCrawler
+            Asynchronous iterator of found streams
+
+        """
+        return StreamCrawler(self, shards, concurrency, prefetch, reconcile=reconcile)
+
+    def watch_streams(
+        self,
+        user_ids: Iterable[str],
+        interval: float = 60.0,
+        dormant_interval: float = 600.0,
+        budget: float = 0.5,
+    ) -> StreamWatcher:
+        """Watches many channels for streams going online, offline or changing their
+        title or game. Replaces calling :meth:`get_stream` in a loop.
+
+        Parameters
+        ----------
+        user_ids : Iterable[str]
+            User IDs of the channels. More can be added with :meth:`StreamWatcher.add`.
+        interval : float
+            Seconds between polls of live and often live channels. Defaults to 60.
+        dormant_interval : float
+            Seconds between polls of dormant channels. Defaults to 600.
+        budget : float
+            Share of the rate limit the watcher may use. Defaults to 0.5.
+
+        Returns
+        -------
+        StreamWatcher
+            Asynchronous iterator of :class:`StreamEvent`
+
+        """
+        return StreamWatcher(self, user_ids, interval, dormant_interval, budget)
 
     async def get_stream(
-        self, user_id: Optional[str] = None, user_login: Optional[str] = None
+        self,
+        user_id: Optional[str] = None,
+        user_login: Optional[str] = None,
+        deadline: Optional[float] = None,
     ) -> Optional[Stream]:
         """Gets information about active stream.
 
@@ -100,6 +366,10 @@ class Client:
             Returns stream broadcast by one specified user ID.
         user_login : Optional[str]
             Returns stream broadcast by one specified user login.
+        deadline : Optional[float]
+            Seconds the lookup may take, including retries and waiting for a batch.
+            :exc:`DeadlineExceeded` is raised when it runs out. Defaults to the deadline
+            of the retry policy.
 
         Returns
         -------
@@ -109,15 +379,24 @@ class Client:
         """
         if user_id and user_login:
             raise TypeError("You must specify only id or only login.")
+        if user_id and self._loaders:
+            return await _with_deadline(self._loaders["stream_user_id"].load(user_id), deadline)
         with suppress(NoMoreItems):
             if user_id:
-                return await self.get_streams(limit=1).filter(user_ids=[user_id]).next()
+                streams = self.get_streams(limit=1).filter(user_ids=[user_id])
+                return await _with_deadline(streams.next(), deadline)
             elif user_login:
-                return await self.get_streams(limit=1).filter(user_logins=[user_login]).next()
+                streams = self.get_streams(limit=1).filter(user_logins=[user_login])
+                return await _with_deadline(streams.next(), deadline)
         return None
 
     def get_users(
-        self, ids: Optional[List[str]] = None, logins: Optional[List[str]] = None
+        self,
+        ids: Optional[List[str]] = None,
+        logins: Optional[List[str]] = None,
+        priority: Optional[Priority] = None,
+        concurrency: int = 4,
+        ordered: bool = True,
     ) -> UserIterator:
         """Gets information about one or more specified Twitch users. Users are
         identified by optional user IDs and/or login name. If neither a user ID nor a
@@ -129,6 +408,14 @@ class Client:
             User IDs. Multiple user IDs can be specified.
         logins : Optional[List[str]]
             User login names. Multiple login names can be specified.
+        priority : Optional[Priority]
+            Rate limit priority of the requests. By default lookups of up to 100 users
+            are interactive and larger ones are bulk.
+        concurrency : int
+            Maximum number of 100-user requests in flight at once. Defaults to 4.
+        ordered : bool
+            Whether users are yielded in request order. If ``False``, they are yielded
+            as responses arrive. Defaults to ``True``.
 
         Returns
         -------
@@ -136,10 +423,13 @@ class Client:
             Asynchronous iterator of found users
 
         """
-        return UserIterator(self, ids, logins)
+        return UserIterator(self, ids, logins, priority, concurrency, ordered)
 
     async def get_user(
-        self, id: Optional[str] = None, login: Optional[str] = None
+        self,
+        id: Optional[str] = None,
+        login: Optional[str] = None,
+        deadline: Optional[float] = None,
     ) -> Optional[User]:
         """Gets information about one specified Twitch user.
 
@@ -149,6 +439,11 @@ class Client:
             User ID.
         login : Optional[str]
             User login name.
+        deadline : Optional[float]
+            Seconds the lookup may take, including retries and waiting for a batch.
+            :exc:`DeadlineExceeded` is raised when it runs out. Defaults to the deadline
+            of the retry policy.
+
         Returns
         -------
         Optional[User]
@@ -157,13 +452,79 @@ class Client:
         """
         if id and login:
             raise TypeError("You must specify only ID or only name.")
+        if self._loaders:
+            if id:
+                return await _with_deadline(self._loaders["user_id"].load(id), deadline)
+            elif login:
+                return await _with_deadline(self._loaders["user_login"].load(login), deadline)
+            return None
         with suppress(NoMoreItems):
             if id:
-                return await self.get_users(ids=[id]).next()
+                return await _with_deadline(self.get_users(ids=[id]).next(), deadline)
             elif login:
-                return await self.get_users(logins=[login]).next()
+                return await _with_deadline(self.get_users(logins=[login]).next(), deadline)
         return None
 
+    async def hydrate(
+        self,
+        streams: Iterable[Stream],
+        users: bool = True,
+        games: bool = True,
+        priority: Optional[Priority] = None,
+        concurrency: int = 4,
+    ) -> List[Stream]:
+        """Fills :attr:`Stream.user` and :attr:`Stream.game` of many streams at once.
+
+        Distinct user and game IDs are looked up in requests of 100, with users and
+        games fetched concurrently, instead of one request per stream as with
+        :meth:`Stream.get_user` and :meth:`Stream.get_game`. Streams sharing a user or
+        game get the same object.
+
+        Parameters
+        ----------
+        streams : Iterable[Stream]
+            Streams to hydrate.
+        users : bool
+            Whether to fill :attr:`Stream.user`. Defaults to ``True``.
+        games : bool
+            Whether to fill :attr:`Stream.game`. Streams without a game are left with
+            ``None``. Defaults to ``True``.
+        priority : Optional[Priority]
+            Rate limit priority of the requests. By default lookups of up to 100 IDs
+            are interactive and larger ones are bulk.
+        concurrency : int
+            Maximum number of 100-ID requests of each kind in flight at once.
+            Defaults to 4.
+
+        Returns
+        -------
+        List[Stream]
+            The hydrated streams.
+
+        """
+        streams = list(streams)
+        user_ids = {stream.user_id for stream in streams} if users else ()
+        game_ids = {stream.game_id for stream in streams if stream.game_id} if games else ()
+        found_users, found_games = await asyncio.gather(
+            self._lookup(self.get_users, user_ids, priority, concurrency),
+            self._lookup(self.get_games, game_ids, priority, concurrency),
+        )
+        for stream in streams:
+            if users:
+                stream.user = found_users.get(stream.user_id)
+                if stream.user is not None:
+                    stream.user.stream = stream
+            if games:
+                stream.game = found_games.get(stream.game_id)
+        return streams
+
+    @staticmethod
+    async def _lookup(get, ids, priority, concurrency) -> dict:
+        if not ids:
+            return {}
+        models = await get(list(ids), None, priority, concurrency, False).flatten()
+        return {model.id: model for model in models}
+
     def create_subscription(
         self, callback: str, topic: Topic, lease_seconds: int = 0, secret: Optional[str] = None,
     ):
@@ -194,3 +555,32 @@ class Client:
 
         """
         return Subscription(self, callback, topic, lease_seconds, secret)
+
+    def create_webhook_receiver(
+        self,
+        path: str = "/webhooks",
+        workers: int = 8,
+        queue_size: int = 1000,
+        put_timeout: float = 1.0,
+    ) -> WebhookReceiver:
+        """Creates a server receiving the notifications of webhook subscriptions.
+
+        Parameters
+        ----------
+        path : str
+            Path of the callback endpoint. Defaults to ``/webhooks``.
+        workers : int
+            Number of tasks running notification handlers. Defaults to 8.
+        queue_size : int
+            Maximum number of notifications waiting for a handler. Defaults to 1000.
+        put_timeout : float
+            Seconds to wait for room in a full queue before answering Twitch with 503.
+            Defaults to 1.
+
+        Returns
+        -------
+        WebhookReceiver
+            Receiver to register subscriptions with
+
+        """
+        return WebhookReceiver(self, path, workers, queue_size, put_timeout)
@@ -0,0 +1,285 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import calendar
+import heapq
+from array import array
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .utils import parse_timestamp
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ("StreamColumns",)
+
+_CATEGORICAL = ("game_id", "language")
+_NUMERIC = ("id", "viewer_count", "started_at")
+
+
+class StreamColumns:
+    """Column store of stream snapshots built straight from page JSON.
+
+    Rows are appended to typed :class:`array.array` columns without creating a
+    :class:`Stream` per stream, and ``game_id`` and ``language`` are dictionary
+    encoded: the columns hold integer codes indexing :attr:`games` and
+    :attr:`languages`. Aggregations use NumPy when it is installed.
+
+    .. container:: operations
+        .. describe:: len(x)
+            Returns the number of rows.
+
+    Attributes
+    -----------
+    id : :class:`array.array`
+        Stream IDs as 64-bit integers.
+    viewer_count : :class:`array.array`
+        Viewer counts.
+    started_at : :class:`array.array`
+        Stream start times as UNIX timestamps in seconds.
+    game_id : :class:`array.array`
+        Codes of the games, indexing :attr:`games`.
+    language : :class:`array.array`
+        Codes of the languages, indexing :attr:`languages`.
+    games : List[str]
+        Distinct game IDs in order of appearance.
+    languages : List[str]
+        Distinct languages in order of appearance.
+
+    """
+
+    __slots__ = (
+        "id",
+        "viewer_count",
+        "started_at",
+        "game_id",
+        "language",
+        "games",
+        "languages",
+        "_game_codes",
+        "_language_codes",
+        "_midnights",
+    )
+
+    def __init__(self):
+        self.id = array("q")
+        self.viewer_count = array("q")
+        self.started_at = array("q")
+        self.game_id = array("i")
+        self.language = array("i")
+        self.games = []
+        self.languages = []
+        self._game_codes = {}
+        self._language_codes = {}
+        self._midnights = {}
+
+    def __len__(self):
+        return len(self.id)
+
+    @classmethod
+    async def collect(cls, iterator) -> "StreamColumns":
+        """Creates columns from all remaining pages of a :class:`StreamIterator` or
+        :class:`StreamCrawler`."""
+        columns = cls()
+        await columns.extend(iterator)
+        return columns
+
+    async def extend(self, iterator):
+        """Appends all remaining pages of a :class:`StreamIterator` or
+        :class:`StreamCrawler`."""
+        async for page in iterator.raw_pages():
+            self.add_page(page)
+
+    def add_page(self, data: List[dict]):
+        """Appends a page of streams as returned by the API."""
+        games, game_codes = self.games, self._game_codes
+        languages, language_codes = self.languages, self._language_codes
+        timestamp = self._timestamp
+        append_id, append_viewers = self.id.append, self.viewer_count.append
+        append_started, append_game, append_language = (
+            self.started_at.append,
+            self.game_id.append,
+            self.language.append,
+        )
+        for element in data:
+            game = element["game_id"]
+            game_code = game_codes.get(game)
+            if game_code is None:
+                game_code = game_codes[game] = len(games)
+                games.append(game)
+            language = element["language"]
+            language_code = language_codes.get(language)
+            if language_code is None:
+                language_code = language_codes[language] = len(languages)
+                languages.append(language)
+
+            append_id(int(element["id"]))
+            append_viewers(element["viewer_count"])
+            append_started(timestamp(element["started_at"]))
+            append_game(game_code)
+            append_language(language_code)
+
+    def clear(self):
+        """Removes all rows."""
+        self.__init__()
+
+    def _timestamp(self, value: str) -> int:
+        # Most streams started on a handful of days, so the date part is converted once.
+        if len(value) == 20 and value[19] == "Z":
+            day = value[:10]
+            midnight = self._midnights.get(day)
+            if midnight is None:
+                midnight = calendar.timegm((int(day[:4]), int(day[5:7]), int(day[8:]), 0, 0, 0))
+                self._midnights[day] = midnight
+            return midnight + int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+        return int(parse_timestamp(value).timestamp())
+
+    def _column(self, name: str) -> array:
+        if name not in _CATEGORICAL and name not in _NUMERIC:
+            raise ValueError(f"Unknown column: {name!r}")
+        return getattr(self, name)
+
+    def _dictionary(self, name: str) -> List[str]:
+        if name == "game_id":
+            return self.games
+        if name == "language":
+            return self.languages
+        raise ValueError(f"Column {name!r} is not dictionary encoded")
+
+    def to_numpy(self) -> Dict[str, "numpy.ndarray"]:
+        """Copies the columns to NumPy arrays, keyed by column name. Requires NumPy.
+
+        Returns
+        -------
+        Dict[str, numpy.ndarray]
+            Columns. ``game_id`` and ``language`` hold codes.
+        """
+        if numpy is None:
+            raise RuntimeError("NumPy is not installed")
+        return {name: numpy.array(self._column(name)) for name in _NUMERIC + _CATEGORICAL}
+
+    def sum_by(self, key: str = "game_id", value: str = "viewer_count") -> Dict[str, int]:
+        """Sums a numeric column grouped by a dictionary encoded column.
+
+        Parameters
+        ----------
+        key : str
+            ``"game_id"`` or ``"language"``.
+        value : str
+            Column to sum.
+
+        Returns
+        -------
+        Dict[str, int]
+            Sums keyed by game ID or language.
+        """
+        keys = self._dictionary(key)
+        codes, values = self._column(key), self._column(value)
+        if numpy is not None and codes:
+            sums = numpy.bincount(
+                numpy.frombuffer(codes, numpy.int32),
+                weights=numpy.frombuffer(values, numpy.int64),
+                minlength=len(keys),
+            )
+            return dict(zip(keys, sums.astype(numpy.int64).tolist()))
+
+        sums = [0] * len(keys)
+        for code, v in zip(codes, values):
+            sums[code] += v
+        return dict(zip(keys, sums))
+
+    def count_by(self, key: str = "game_id") -> Dict[str, int]:
+        """Counts rows grouped by ``"game_id"`` or ``"language"``."""
+        keys = self._dictionary(key)
+        codes = self._column(key)
+        if numpy is not None and codes:
+            counts = numpy.bincount(numpy.frombuffer(codes, numpy.int32), minlength=len(keys))
+            return dict(zip(keys, counts.tolist()))
+
+        counts = [0] * len(keys)
+        for code in codes:
+            counts[code] += 1
+        return dict(zip(keys, counts))
+
+    def top_games(self, k: int = 10) -> List[Tuple[str, int]]:
+        """Returns the ``k`` games with the most viewers as ``(game_id, viewers)`` pairs,
+        most watched first."""
+        return heapq.nlargest(k, self.sum_by("game_id").items(), key=itemgetter(1))
+
+    def top_streams(self, k: int = 10) -> List[Tuple[str, int]]:
+        """Returns the ``k`` most watched streams as ``(stream_id, viewer_count)`` pairs,
+        most watched first."""
+        ids, viewers = self.id, self.viewer_count
+        k = min(k, len(viewers))
+        if k <= 0:
+            return []
+        if numpy is not None:
+            counts = numpy.frombuffer(viewers, numpy.int64)
+            rows = numpy.argpartition(counts, len(counts) - k)[len(counts) - k :]
+            rows = rows[numpy.argsort(counts[rows], kind="stable")[::-1]].tolist()
+        else:
+            rows = heapq.nlargest(k, range(len(viewers)), key=viewers.__getitem__)
+        return [(str(ids[row]), viewers[row]) for row in rows]
+
+    def histogram(self, bins: Sequence[float], column: str = "viewer_count") -> List[int]:
+        """Counts the values of a numeric column falling in each bin.
+
+        Parameters
+        ----------
+        bins : Sequence[float]
+            Increasing bin edges. Every bin is half-open except the last one, which
+            includes its right edge; values outside the edges are not counted.
+        column : str
+            ``"viewer_count"`` or ``"started_at"``.
+
+        Returns
+        -------
+        List[int]
+            Counts, one per bin.
+        """
+        if len(bins) < 2:
+            raise ValueError("At least two bin edges are required")
+        values = self._column(column)
+        if numpy is not None and values:
+            counts, _ = numpy.histogram(numpy.frombuffer(values, numpy.int64), bins=bins)
+            return counts.tolist()
+
+        last = len(bins) - 2
+        counts = [0] * (last + 1)
+        low, high = bins[0], bins[-1]
+        for v in values:
+            if low <= v <= high:
+                counts[min(bisect_right(bins, v) - 1, last)] += 1
+        return counts
+
+    def decode(self, row: int) -> Dict[str, Any]:
+        """Returns a row as a dict with the game ID and language decoded."""
+        return {
+            "id": str(self.id[row]),
+            "viewer_count": self.viewer_count[row],
+            "started_at": self.started_at[row],
+            "game_id": self.games[self.game_id[row]],
+            "language": self.languages[self.language[row]],
+        }
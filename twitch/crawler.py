@@ -0,0 +1,231 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import asyncio
+from collections import deque
+from typing import AsyncGenerator, Dict, List, Optional
+
+from .iterators import StreamIterator, _AsyncIterator, _models
+from .ratelimit import Priority
+from .stream import Stream
+
+__all__ = ("StreamCrawler", "LANGUAGES")
+
+# Broadcast languages available on Twitch, used as the default shards. Roughly the
+# largest first, so they are not queued behind small ones.
+LANGUAGES = (
+    "en",
+    "es",
+    "de",
+    "ru",
+    "fr",
+    "pt",
+    "ja",
+    "ko",
+    "it",
+    "zh",
+    "zh-hk",
+    "pl",
+    "tr",
+    "ar",
+    "cs",
+    "da",
+    "nl",
+    "fi",
+    "el",
+    "hu",
+    "id",
+    "no",
+    "sv",
+    "th",
+    "uk",
+    "vi",
+    "bg",
+    "ca",
+    "hi",
+    "ms",
+    "ro",
+    "sk",
+    "tl",
+    "asl",
+    "other",
+)
+
+_DONE = object()
+
+
+async def _crawl_shard(
+    iterator: StreamIterator, pages: asyncio.Queue, semaphore: asyncio.Semaphore
+):
+    # Holds no reference to the crawler, so an abandoned crawler can cancel it.
+    try:
+        async with semaphore:
+            async for page in iterator.raw_pages():
+                await pages.put(page)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await pages.put(e)
+    finally:
+        iterator.close()
+    await pages.put(_DONE)
+
+
+class StreamCrawler(_AsyncIterator):
+    """Walks all live streams in shards that are fetched concurrently.
+
+    Every shard is a :class:`StreamIterator` restricted by ``languages`` and/or
+    ``game_ids`` filters. Up to ``concurrency`` shards are walked at once, sharing
+    the client's rate limit at :attr:`Priority.BULK`, and their pages are merged
+    into one iterator. A stream that shows up in several shards, e.g. because it
+    changed language during the crawl, is returned only once.
+
+    With ``reconcile``, one unfiltered walk follows the shards and returns only the
+    streams they missed, counted in :attr:`reconciled`. It catches streams in
+    languages the shards do not list, at the cost of walking every stream twice.
+
+    Note
+    ----
+    Streams matching none of the shards are not returned unless ``reconcile`` is set.
+    The default shards cover every language in :data:`LANGUAGES`.
+
+    Each shard is walked serially, as every page needs the cursor of the previous
+    one, so the largest shard, usually ``en``, bounds the wall time of the crawl.
+    It can be split by ``game_ids`` into shards that run in parallel, e.g.
+    ``{"languages": ["en"], "game_ids": [...]}`` for groups of the biggest games,
+    but such shards return only the streams of the listed games.
+
+    Attributes
+    -----------
+    shards : List[Dict[str, List[str]]]
+        Filters of the shards, as accepted by :meth:`StreamIterator.filter`.
+    concurrency : int
+        Maximum number of shards walked at once.
+    reconcile : bool
+        Whether an unfiltered walk follows the shards.
+    seen : Set[int]
+        IDs of the streams returned so far.
+    reconciled : int
+        Number of streams returned by the unfiltered walk.
+
+    """
+
+    def __init__(
+        self,
+        client,
+        shards: Optional[List[Dict[str, List[str]]]] = None,
+        concurrency: int = 8,
+        prefetch: int = 1,
+        priority: Priority = Priority.BULK,
+        reconcile: bool = False,
+    ):
+        if concurrency < 1:
+            raise ValueError("'concurrency' must be at least 1")
+        self.client = client
+        if shards is None:
+            shards = [{"languages": [language]} for language in LANGUAGES]
+        self.shards = shards
+        self.concurrency = concurrency
+        self.reconcile = reconcile
+        self.seen = set()
+        self.reconciled = 0
+
+        self._iterators = []
+        for shard in shards:
+            iterator = StreamIterator(client, None, priority, prefetch, snapshot=True)
+            iterator.filter(**shard)
+            iterator.seen = self.seen
+            self._iterators.append(iterator)
+        self._reconciler = None
+        if reconcile:
+            self._reconciler = StreamIterator(client, None, priority, prefetch, snapshot=True)
+            self._reconciler.seen = self.seen
+        self._buffer = deque()
+        self._pages = None
+        self._tasks = []
+        self._running = 0
+        self._reconciling = False
+        self._closed = False
+
+    @property
+    def duplicates(self) -> int:
+        """Number of streams dropped because they were already returned."""
+        return sum(iterator.duplicates for iterator in self._iterators)
+
+    def _start(self):
+        self._pages = asyncio.Queue(self.concurrency * 2)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self._tasks = [
+            asyncio.ensure_future(_crawl_shard(iterator, self._pages, semaphore))
+            for iterator in self._iterators
+        ]
+        self._running = len(self._tasks)
+
+    async def raw_pages(self) -> AsyncGenerator[List[dict], None]:
+        """Yields the remaining pages as decoded JSON, without creating :class:`Stream`
+        objects. Should not be mixed with item iteration."""
+        while True:
+            data = await self._next_raw_page()
+            if data is None:
+                return
+            yield data
+
+    async def _next_page(self) -> Optional[List[Stream]]:
+        data = await self._next_raw_page()
+        if data is None:
+            return None
+        return _models(self.client, Stream, data)
+
+    async def _next_raw_page(self) -> Optional[List[dict]]:
+        if self._pages is None:
+            self._start()
+        while True:
+            while self._running:
+                page = await self._pages.get()
+                if page is _DONE:
+                    self._running -= 1
+                elif isinstance(page, Exception):
+                    self.close()
+                    raise page
+                else:
+                    if self._reconciling:
+                        self.reconciled += len(page)
+                    return page
+            if self._closed or self._reconciler is None or self._reconciling:
+                return None
+            # The shards are exhausted: walk everything once more for what they missed.
+            self._reconciling = True
+            self._running = 1
+            self._tasks.append(
+                asyncio.ensure_future(
+                    _crawl_shard(self._reconciler, self._pages, asyncio.Semaphore(1))
+                )
+            )
+
+    def close(self):
+        """Stops all shards."""
+        self._closed = True
+        for task in self._tasks:
+            task.cancel()
+        self._running = 0
+
+    def __del__(self):
+        self.close()
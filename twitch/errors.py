@@ -21,3 +21,11 @@ class HTTPException(TwitchException):
 
 class NoMoreItems(TwitchException):
     pass
+
+
+class DeadlineExceeded(TwitchException):
+    pass
+
+
+class CircuitBreakerOpen(TwitchException):
+    pass
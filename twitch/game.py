@@ -1,10 +1,13 @@
+from operator import itemgetter
 from typing import TYPE_CHECKING
 
+from .utils import _LazyModel
+
 if TYPE_CHECKING:
     from .client import Client
 
 
-class Game:
+class Game(_LazyModel):
     """Represents a Twitch Game
 
         .. container:: operations
@@ -25,10 +28,11 @@ class Game:
         Game name.
     """
 
-    __slots__ = ("client", "_box_art_url", "id", "name")
+    __slots__ = ("client", "_box_art_url", "id", "name", "__weakref__")
 
     def __init__(self, client: "Client", data: dict):
         self.client = client
+        self._data = None
         self._update(data)
 
     def __str__(self):
@@ -40,10 +44,11 @@ class Game:
     def __ne__(self, other):
         return not self.__eq__(other)
 
-    def _update(self, data: dict):
-        self._box_art_url = data["box_art_url"]
-        self.id = data["id"]
-        self.name = data["name"]
+    _decoders = {
+        "_box_art_url": itemgetter("box_art_url"),
+        "id": itemgetter("id"),
+        "name": itemgetter("name"),
+    }
 
     def box_art_url(self, width: int = 144, height: int = 192):
         """Game’s box art URL. All image URLs have variable width and height.
@@ -21,26 +21,67 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 #  SOFTWARE.
 import asyncio
-import atexit
-import datetime as dt
+import importlib
 import json
-import weakref
+import logging
+import time
 from contextlib import suppress
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 from urllib.parse import quote
 
 import aiohttp
 
-from .errors import HTTPException
+from .auth import Credential, TokenManager
+from .cache import MISSING, NOT_FOUND, ResponseCache, TTLCache
+from .catalog import GameCatalog
+from .errors import DeadlineExceeded, HTTPException
+from .metrics import Metrics
+from .planner import MAX_LOOKUP_PARAMS
+from .ratelimit import Priority, PriorityStats
+from .retry import CircuitBreaker, RetryPolicy
 
+log = logging.getLogger(__name__)
 
-async def json_or_text(response):
-    text = await response.text(encoding="utf-8")
+HOOK_EVENTS = frozenset(
+    {
+        "request_start",
+        "request_end",
+        "response",
+        "ratelimit_wait",
+        "retry",
+        "coalesced",
+        "token_refresh",
+    }
+)
+
+
+async def json_or_text(response, loads: Callable[[bytes], Any] = json.loads):
+    body = await response.read()
     with suppress(KeyError):
         if "application/json" in response.headers["content-type"]:
-            return json.loads(text)
+            return loads(body)
+
+    return body.decode("utf-8")
+
+
+def _resolve_loads(json_loads: Union[str, Callable[[bytes], Any], None]) -> Callable:
+    """Returns a JSON decoder accepting bytes. ``json_loads`` is either a callable or the
+    name of a module providing ``loads``, e.g. ``"orjson"`` or ``"ujson"``. Falls back to
+    :func:`json.loads` when the module is not installed."""
+    if json_loads is None:
+        return json.loads
+    if callable(json_loads):
+        return json_loads
+    try:
+        return importlib.import_module(json_loads).loads
+    except ImportError:
+        return json.loads
 
-    return text
+
+def _lookup_route(path: str, params: List[Tuple[str, str]]) -> "Route":
+    if len(params) > MAX_LOOKUP_PARAMS:
+        raise OverflowError(f"Too many lookup keys: {len(params)}. Maximum: {MAX_LOOKUP_PARAMS}")
+    return Route("GET", path, params)
 
 
 class Route:
@@ -59,96 +100,544 @@ class Route:
     def __hash__(self):
         return hash(repr(self))
 
+    def __eq__(self, other):
+        return isinstance(other, Route) and repr(other) == repr(self)
+
+
+class HTTPClient:
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        *,
+        session: Optional[aiohttp.ClientSession] = None,
+        connector: Optional[aiohttp.BaseConnector] = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        ttl_dns_cache: Optional[int] = 10,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        token_cache: Optional[str] = None,
+        json_loads: Union[str, Callable[[bytes], Any], None] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Union[CircuitBreaker, bool] = True,
+        metrics: Union[Metrics, bool] = False,
+        cache: Union[ResponseCache, bool] = False,
+        game_catalog: Union[GameCatalog, str, None] = None,
+        credentials: Optional[List[Tuple[str, Optional[str]]]] = None,
+        base_url: str = Route.BASE_URL,
+        token_url: str = TokenManager.TOKEN_URL,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.token_url = token_url
+        self._session = session
+        self._owns_session = session is None
+        self._connector = connector
+        self._connector_options = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "ttl_dns_cache": ttl_dns_cache,
+        }
+        self._timeout = timeout
+        self._json_loads = _resolve_loads(json_loads)
+        self.retry_policy = retry_policy or RetryPolicy()
+        if circuit_breaker is True:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breaker = circuit_breaker or None
+        self._credentials = [Credential(self, client_id, client_secret, token_cache)]
+        for extra_id, extra_secret in credentials or ():
+            extra_cache = f"{token_cache}.{extra_id}" if token_cache else None
+            self._credentials.append(Credential(self, extra_id, extra_secret, extra_cache))
+        self._inflight = {}
+        self._inflight_keys = {}
+        self.coalesced = 0
+        if cache is True:
+            cache = ResponseCache()
+        self.cache = cache or None
+        self._owns_catalog = isinstance(game_catalog, str)
+        if self._owns_catalog:
+            game_catalog = GameCatalog(game_catalog)
+        self.game_catalog = game_catalog
+        self._hooks = {}
+        self._closed = False
+        if metrics is True:
+            metrics = Metrics()
+        self.metrics = metrics or None
+        if self.metrics is not None:
+            self.metrics.attach(self)
+
+    @property
+    def credentials(self) -> List[Credential]:
+        return list(self._credentials)
 
-class MaybeUnlock:
-    def __init__(self, lock):
-        self.lock = lock
-        self._unlock = True
+    @property
+    def priority_stats(self) -> Dict[Priority, PriorityStats]:
+        """Queue depth and wait time of rate limited requests per :class:`Priority`,
+        summed over all credentials."""
+        if len(self._credentials) == 1:
+            return self._credentials[0].ratelimiter.stats
 
-    def __enter__(self):
-        return self
+        merged = {priority: PriorityStats() for priority in Priority}
+        for credential in self._credentials:
+            for priority, stats in credential.ratelimiter.stats.items():
+                total = merged[priority]
+                total.waiting += stats.waiting
+                total.admitted += stats.admitted
+                total.total_wait += stats.total_wait
+                total.max_wait = max(total.max_wait, stats.max_wait)
+        return merged
 
-    def defer(self):
-        self._unlock = False
+    def _pick_credential(self, priority: Priority, failed: Set[Credential]) -> Credential:
+        """Returns the credential that can send a request soonest, skipping the ones
+        that failed for the current request unless all of them did."""
+        credentials = self._credentials
+        if len(credentials) == 1:
+            return credentials[0]
+        candidates = [c for c in credentials if c not in failed] or credentials
+        return min(candidates, key=lambda c: c._rank(priority))
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self._unlock:
-            self.lock.release()
+    def add_hook(self, event: str, callback: Callable[..., None]):
+        """Registers a synchronous callback for a request lifecycle event.
 
+        Events and their arguments:
 
-class HTTPClient:
-    def __init__(self, client_id: str, client_secret: str):
-        self._client_id = client_id
-        self._client_secret = client_secret
-        self._token = None
-        self.loop = asyncio.get_event_loop()
-        self._session = aiohttp.ClientSession()
-        self._locks = weakref.WeakValueDictionary()
-        atexit.register(self._close)
-
-    def _close(self):
-        self.loop.run_until_complete(self._session.close())
-
-    async def _get_token(self):
-        response = await self._session.post(
-            "https://id.twitch.tv/oauth2/token",
-            params={
-                "client_id": self._client_id,
-                "client_secret": self._client_secret,
-                "grant_type": "client_credentials",
-            },
-        )
-        response_body = await response.json()
-        return response_body["access_token"]
+        - ``request_start(route)``: a request is about to be sent.
+        - ``request_end(route, elapsed, error)``: a request finished after all retries;
+          ``error`` is the raised exception or ``None``.
+        - ``response(route, status, network, parse, remaining)``: a response arrived;
+          ``network`` and ``parse`` are seconds spent reading and decoding it,
+          ``remaining`` is the ``Ratelimit-Remaining`` header.
+        - ``ratelimit_wait(route, waited)``: seconds spent waiting on the rate limiter.
+        - ``retry(route, attempt, delay)``: a request is retried after ``delay`` seconds.
+        - ``coalesced(route)``: a request was served by an identical in-flight request.
+        - ``token_refresh(client_id)``: a new app access token was obtained.
+
+        Without registered hooks the request path does no timing at all.
+        """
+        if event not in HOOK_EVENTS:
+            raise ValueError(f"Unknown event: {event!r}")
+        self._hooks.setdefault(event, []).append(callback)
+
+    def remove_hook(self, event: str, callback: Callable[..., None]):
+        with suppress(KeyError, ValueError):
+            self._hooks[event].remove(callback)
+            if not self._hooks[event]:
+                del self._hooks[event]
+
+    def _dispatch(self, event: str, *args):
+        for callback in self._hooks.get(event, ()):
+            try:
+                callback(*args)
+            except Exception:
+                log.exception("Error in %s hook %r", event, callback)
 
-    async def request(self, route: Route, **kwargs):
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the session, creating it on the running event loop on first use."""
+        if self._closed:
+            raise RuntimeError("The client is closed")
+        if self._session is None or (self._owns_session and self._session.closed):
+            options = {}
+            if self._connector is not None:
+                options["connector"] = self._connector
+                options["connector_owner"] = False
+            else:
+                options["connector"] = aiohttp.TCPConnector(**self._connector_options)
+            if self._timeout is not None:
+                options["timeout"] = self._timeout
+            self._session = aiohttp.ClientSession(**options)
+        return self._session
+
+    async def close(self):
+        """Stops background tasks and closes the session and the game catalog unless
+        they were passed in. Requests made afterwards raise :exc:`RuntimeError`."""
+        self._closed = True
+        for credential in self._credentials:
+            credential.tokens.close()
+        if self._owns_catalog:
+            self.game_catalog.close()
+        elif self.game_catalog is not None:
+            self.game_catalog.stop_refresh(self._refresh_games)
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+
+    async def request(
+        self,
+        route: Route,
+        *,
+        coalesce: bool = True,
+        deadline: Optional[float] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs,
+    ):
+        """Sends a request to the API.
+
+        Identical GET requests that are already in flight are coalesced: the caller waits
+        for the pending request and receives the same decoded response object instead of
+        sending its own. Only requests of the same or a higher priority are joined, so a
+        caller never waits in the queue position of a lower one. ``coalesce=False``
+        always sends a new request. The number of requests saved this way is counted in
+        :attr:`coalesced`.
+
+        ``deadline`` limits the seconds the call may take including retries and defaults
+        to the deadline of the retry policy. :exc:`DeadlineExceeded` is raised when it
+        runs out.
+
+        ``priority`` decides the order in which queued requests get rate limit budget,
+        see :class:`RateLimiter`.
+        """
+        if deadline is None:
+            deadline = self.retry_policy.deadline
+        expires = None if deadline is None else time.monotonic() + deadline
+
+        if not coalesce or route.method != "GET" or kwargs:
+            coro = self._request(route, expires, priority, **kwargs)
+        else:
+            for level in Priority:
+                if level > priority:
+                    break
+                future = self._inflight.get((route, level))
+                if future is not None:
+                    break
+            if future is not None:
+                self.coalesced += 1
+                if self._hooks:
+                    self._dispatch("coalesced", route)
+            else:
+                key = (route, priority)
+                future = asyncio.ensure_future(self._request(route, None, priority))
+                self._inflight[key] = future
+                future.add_done_callback(lambda f: self._request_done(key, f))
+            coro = asyncio.shield(future)
+
+        if expires is None:
+            return await coro
+        try:
+            return await asyncio.wait_for(coro, deadline)
+        except asyncio.TimeoutError:
+            if time.monotonic() < expires:
+                raise
+            raise DeadlineExceeded(f"Deadline of {deadline}s exceeded: {route!r}") from None
+
+    def _request_done(self, key: Tuple[Route, Priority], future: asyncio.Future):
+        self._inflight.pop(key, None)
+        if not future.cancelled():
+            # Retrieve the exception so it is not reported if every waiter is gone.
+            future.exception()
+
+    async def _request(
+        self,
+        route: Route,
+        expires: Optional[float] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs,
+    ):
+        if not self._hooks:
+            return await self._send(route, expires, priority, **kwargs)
+
+        self._dispatch("request_start", route)
+        started = time.perf_counter()
+        error = None
+        try:
+            return await self._send(route, expires, priority, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._dispatch("request_end", route, time.perf_counter() - started, error)
+
+    async def _send(
+        self,
+        route: Route,
+        expires: Optional[float] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs,
+    ):
         method = route.method
-        url = route.url
-        route_hash = hash(route)
-        lock = self._locks.get(route_hash)
-        if lock is None:
-            lock = asyncio.Lock()
-            self._locks[route_hash] = lock
-
-        if not self._token:
-            self._token = await self._get_token()
-
-        await lock.acquire()
-        with MaybeUnlock(lock) as maybe_lock:
-            for attempt in range(5):
-                headers = {"Client-ID": self._client_id, "Authorization": f"Bearer {self._token}"}
-                kwargs["headers"] = headers
-                kwargs["params"] = route.params
-                async with self._session.request(method, url, **kwargs) as r:
-                    data = await json_or_text(r)
-                    remaining = r.headers.get("Ratelimit-Remaining")
-                    if remaining == "0" and r.status != 429:
-                        now = dt.datetime.utcnow()
-                        reset = dt.datetime.utcfromtimestamp(float(r.headers["Ratelimit-Reset"]))
-                        delta = (reset - now).total_seconds()
-                        maybe_lock.defer()
-                        self.loop.call_later(delta, lock.release)
-
-                    if 300 > r.status >= 200:
-                        return data
-                    elif r.status in {429, 500, 502, 503}:
-                        await asyncio.sleep(1 + attempt * 2)
-                        continue
-                    elif r.status == 403:
-                        self._token = await self._get_token()
-                        continue
+        url = self.base_url + route.path
+        policy = self.retry_policy
+        breaker = self.circuit_breaker
+        failed = set()
+
+        for attempt in range(policy.max_attempts):
+            last_attempt = attempt + 1 == policy.max_attempts
+            if breaker is not None:
+                breaker.check()
+            credential = self._pick_credential(priority, failed)
+            ratelimiter = credential.ratelimiter
+            token = await credential.tokens.get()
+            headers = {"Client-ID": credential.client_id, "Authorization": f"Bearer {token}"}
+            kwargs["headers"] = headers
+            kwargs["params"] = route.params
+            # Hooks may be added or removed while this attempt waits; time it consistently.
+            timed = bool(self._hooks)
+            if timed:
+                waiting = time.perf_counter()
+            await ratelimiter.acquire(priority)
+            response_headers = None
+            try:
+                if timed:
+                    sent = time.perf_counter()
+                    self._dispatch("ratelimit_wait", route, sent - waiting)
+                async with self._get_session().request(method, url, **kwargs) as r:
+                    response_headers = r.headers
+                    if timed:
+                        await r.read()
+                        received = time.perf_counter()
+                    data = await json_or_text(r, self._json_loads)
+                    if timed:
+                        self._dispatch(
+                            "response",
+                            route,
+                            r.status,
+                            received - sent,
+                            time.perf_counter() - received,
+                            r.headers.get("Ratelimit-Remaining"),
+                        )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if breaker is not None:
+                    breaker.record_failure()
+                if last_attempt:
+                    raise
+                await self._backoff(route, attempt, policy.delay(attempt), expires)
+                continue
+            finally:
+                ratelimiter.release(response_headers)
+
+            if breaker is not None:
+                if r.status >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+            if 300 > r.status >= 200:
+                return data
+            elif r.status == 429 and len(failed) + 1 < len(self._credentials):
+                # This bucket is exhausted, fail over to another credential.
+                failed.add(credential)
+                continue
+            elif policy.retries(r.status):
+                if not last_attempt:
+                    delay = policy.delay(attempt, r.headers)
+                    await self._backoff(route, attempt, delay, expires)
+                continue
+            elif r.status in {401, 403}:
+                credential.tokens.invalidate(token)
+                failed.add(credential)
+                continue
+            else:
+                raise HTTPException(r, data)
+
+        raise HTTPException(r, data)
+
+    async def _backoff(self, route: Route, attempt: int, delay: float, expires: Optional[float]):
+        if expires is not None and time.monotonic() + delay > expires:
+            raise DeadlineExceeded(f"Deadline would be exceeded by retrying {route!r}")
+        if self._hooks:
+            self._dispatch("retry", route, attempt + 1, delay)
+        await asyncio.sleep(delay)
+
+    def known(self, path: str, param: str, key: str) -> bool:
+        """Whether a normalized lookup key of ``/games`` or ``/users`` is cached, being
+        fetched or, for games, in the game catalog."""
+        if path == "/games" and self.game_catalog is not None:
+            if self.game_catalog.known(param, key):
+                return True
+        if self.cache is None:
+            return False
+        cache = self.cache.games if path == "/games" else self.cache.users
+        return (param, key) in cache or (path, param, key) in self._inflight_keys
+
+    async def _cached_request(
+        self,
+        cache: TTLCache,
+        path: str,
+        lookups: List[Tuple[str, Optional[List[str]], Callable[[str], str]]],
+        coalesce: bool,
+        priority: Priority,
+        deadline: Optional[float] = None,
+    ):
+        """Answers a lookup request from ``cache`` and requests only the missing keys.
+
+        ``lookups`` holds tuples of a query parameter, the requested values and a key
+        normalizer. Entries in the response are also keyed by the response field of the
+        same name as the parameter; requested keys absent from it are cached as missing.
+        Keys that another request is already fetching are taken from its response, or
+        requested again if it fails. ``deadline`` also bounds the wait for those.
+        """
+        expires = None if deadline is None else time.monotonic() + deadline
+        normalizers = {param: normalize for param, _, normalize in lookups}
+        pending = [
+            (param, value, (param, normalize(value)))
+            for param, values, normalize in lookups
+            for value in values or ()
+        ]
+        data = {}
+        for attempt in range(2):
+            params = []
+            keys = []
+            waiting = {}
+            for param, value, key in pending:
+                entry = cache.get(key)
+                if entry is MISSING:
+                    shared = None if attempt else self._inflight_keys.get((path,) + key)
+                    # A request of a lower priority would hold us back in its queue.
+                    if shared is None or shared[1] > priority:
+                        params.append((param, value))
+                        keys.append(key)
                     else:
-                        raise HTTPException(r, data)
+                        waiting[key] = (param, value, shared[0])
+                elif entry is not NOT_FOUND:
+                    data[entry["id"]] = entry
+
+            futures = {future for _, _, future in waiting.values()}
+            remaining = None if expires is None else max(0.0, expires - time.monotonic())
+            if params:
+                own = self._fetch_keys(
+                    cache, path, lookups, params, keys, coalesce, priority, remaining
+                )
+                futures.add(own)
+            if not futures:
+                break
+            # Unlike gather(), wait() does not cancel the shared requests if we are.
+            done, _ = await asyncio.wait(futures, timeout=remaining)
+            if len(done) < len(futures):
+                raise DeadlineExceeded(f"Deadline of {deadline}s exceeded: {path}")
+            if params:
+                data.update((entry["id"], entry) for entry in own.result()["data"])
+
+            pending = []
+            for key, (param, value, future) in waiting.items():
+                if future.cancelled() or future.exception() is not None:
+                    pending.append((param, value, key))
+            for future in {future for _, _, future in waiting.values()}:
+                if future.cancelled() or future.exception() is not None:
+                    continue
+                for entry in future.result()["data"]:
+                    for param, normalize in normalizers.items():
+                        if (param, normalize(entry[param])) in waiting:
+                            data[entry["id"]] = entry
+            if not pending:
+                break
 
-            raise HTTPException(r, data)
+        return {"data": list(data.values())}
+
+    def _fetch_keys(
+        self,
+        cache: TTLCache,
+        path: str,
+        lookups: List[Tuple[str, Optional[List[str]], Callable[[str], str]]],
+        params: List[Tuple[str, str]],
+        keys: List[Tuple[str, str]],
+        coalesce: bool,
+        priority: Priority,
+        deadline: Optional[float] = None,
+    ) -> asyncio.Future:
+        future = asyncio.ensure_future(
+            self._request_keys(cache, path, lookups, params, keys, coalesce, priority, deadline)
+        )
+        inflight = [(path,) + key for key in keys]
+        for key in inflight:
+            self._inflight_keys[key] = future, priority
+        future.add_done_callback(lambda f: self._fetch_keys_done(inflight, f))
+        return future
+
+    def _fetch_keys_done(self, inflight: List[tuple], future: asyncio.Future):
+        for key in inflight:
+            shared = self._inflight_keys.get(key)
+            if shared is not None and shared[0] is future:
+                del self._inflight_keys[key]
+        if not future.cancelled():
+            future.exception()
+
+    async def _request_keys(
+        self,
+        cache: TTLCache,
+        path: str,
+        lookups: List[Tuple[str, Optional[List[str]], Callable[[str], str]]],
+        params: List[Tuple[str, str]],
+        keys: List[Tuple[str, str]],
+        coalesce: bool,
+        priority: Priority,
+        deadline: Optional[float] = None,
+    ):
+        # Caches the entries before waiters of the shared request resume.
+        if path == "/games" and self.game_catalog is not None:
+            resp = await self._catalog_games(params, coalesce, priority, deadline)
+        else:
+            resp = await self.request(
+                _lookup_route(path, params), coalesce=coalesce, deadline=deadline, priority=priority
+            )
+        found = set()
+        for entry in resp["data"]:
+            for param, _, normalize in lookups:
+                key = (param, normalize(entry[param]))
+                cache.set(key, entry)
+                found.add(key)
+        for key in keys:
+            if key not in found:
+                cache.set_missing(key)
+        return resp
+
+    def get_games(
+        self,
+        game_ids: List[str] = None,
+        game_names: List[str] = None,
+        coalesce: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: Optional[float] = None,
+    ):
+        # Hot games are answered from memory; the catalog is consulted on a miss only.
+        if self.cache is not None:
+            lookups = [("id", game_ids, str), ("name", game_names, str)]
+            return self._cached_request(
+                self.cache.games, "/games", lookups, coalesce, priority, deadline
+            )
 
-    def get_games(self, game_ids: List[str] = None, game_names: List[str] = None):
         params = []
         if game_ids:
             params.extend(("id", game_id) for game_id in game_ids)
         if game_names:
             params.extend(("name", game_name) for game_name in game_names)
-        return self.request(Route("GET", "/games", params))
+        if self.game_catalog is not None:
+            return self._catalog_games(params, coalesce, priority, deadline)
+        return self.request(
+            _lookup_route("/games", params), coalesce=coalesce, deadline=deadline, priority=priority
+        )
+
+    async def _catalog_games(
+        self,
+        params: List[Tuple[str, str]],
+        coalesce: bool,
+        priority: Priority,
+        deadline: Optional[float] = None,
+    ):
+        """Answers a games request from the game catalog and requests only the games it
+        does not know, storing them. The database is accessed in the catalog's thread."""
+        catalog = self.game_catalog
+        game_ids = [value for param, value in params if param == "id"]
+        game_names = [value for param, value in params if param == "name"]
+        data, game_ids, game_names = await catalog.run_in_executor(
+            catalog.lookup, game_ids, game_names
+        )
+        if game_ids or game_names:
+            missing = [("id", game_id) for game_id in game_ids]
+            missing.extend(("name", game_name) for game_name in game_names)
+            resp = await self.request(
+                _lookup_route("/games", missing),
+                coalesce=coalesce,
+                deadline=deadline,
+                priority=priority,
+            )
+            await catalog.run_in_executor(catalog.store, resp["data"])
+            data.update((entry["id"], entry) for entry in resp["data"])
+        catalog.refresh_stale(self._refresh_games)
+        return {"data": list(data.values())}
+
+    def _refresh_games(self, game_ids: List[str]):
+        # Bypasses the response cache, which may hold entries as old as the catalog's.
+        route = _lookup_route("/games", [("id", game_id) for game_id in game_ids])
+        return self.request(route, coalesce=False, priority=Priority.BULK)
 
     def get_streams(
         self,
@@ -159,6 +648,9 @@ class HTTPClient:
         first: int = 20,
         after: str = None,
         before: str = None,
+        coalesce: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: Optional[float] = None,
     ):
         params = [("first", first)]
         if user_ids:
@@ -173,15 +665,31 @@ class HTTPClient:
             params.append(("after", after))
         if before:
             params.append(("before", before))
-        return self.request(Route("GET", "/streams", params))
+        route = Route("GET", "/streams", params)
+        return self.request(route, coalesce=coalesce, deadline=deadline, priority=priority)
+
+    def get_users(
+        self,
+        user_ids: List[str] = None,
+        user_logins: List[str] = None,
+        coalesce: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: Optional[float] = None,
+    ):
+        if self.cache is not None and (user_ids or user_logins):
+            lookups = [("id", user_ids, str), ("login", user_logins, str.lower)]
+            return self._cached_request(
+                self.cache.users, "/users", lookups, coalesce, priority, deadline
+            )
 
-    def get_users(self, user_ids: List[str] = None, user_logins: List[str] = None):
         params = []
         if user_ids:
             params.extend(("id", user_id) for user_id in user_ids)
         if user_logins:
             params.extend(("login", user_login) for user_login in user_logins)
-        return self.request(Route("GET", "/users", params))
+        return self.request(
+            _lookup_route("/users", params), coalesce=coalesce, deadline=deadline, priority=priority
+        )
 
     def subscribe_to_events(
         self, callback: str, topic: str, lease_seconds: int, secret: Optional[str] = None,
@@ -0,0 +1,94 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import weakref
+from collections import OrderedDict
+from typing import Optional, Type, TypeVar
+
+__all__ = ("IdentityMap",)
+
+T = TypeVar("T")
+
+
+class IdentityMap:
+    """Keeps one :class:`User`, :class:`Game` or :class:`Stream` object per ID.
+
+    When a payload arrives for an entity that is already mapped, the existing object
+    is updated in place and returned instead of creating a new one, so state attached
+    to it, e.g. :attr:`Stream.user`, is shared by every lookup.
+
+    Objects are evicted either least recently used first once there are more than
+    ``maxsize`` of them, or, with ``weak``, as soon as nothing else references them.
+
+    .. container:: operations
+        .. describe:: len(x)
+            Returns the number of mapped objects.
+
+    Attributes
+    -----------
+    maxsize : Optional[int]
+        Maximum number of mapped objects. Ignored if ``weak`` is set. ``None`` means no
+        limit. Defaults to 10000.
+    weak : bool
+        Whether objects are held by weak references. Defaults to ``False``.
+    hits : int
+        Payloads that updated an existing object.
+    misses : int
+        Payloads that created a new object.
+
+    """
+
+    def __init__(self, maxsize: Optional[int] = 10000, weak: bool = False):
+        self.maxsize = maxsize
+        self.weak = weak
+        self.hits = 0
+        self.misses = 0
+        self._objects = weakref.WeakValueDictionary() if weak else OrderedDict()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def get(self, cls: Type[T], id: str) -> Optional[T]:
+        """Returns the mapped object of type ``cls`` with ``id``, if any. Does not count
+        towards the statistics."""
+        return self._objects.get((cls, id))
+
+    def load(self, cls: Type[T], client, data: dict) -> T:
+        """Returns the object of type ``cls`` for ``data``, updating the mapped object
+        or creating and mapping a new one."""
+        key = (cls, data["id"])
+        obj = self._objects.get(key)
+        if obj is not None:
+            self.hits += 1
+            obj._update(data)
+            if not self.weak:
+                self._objects.move_to_end(key)
+            return obj
+
+        self.misses += 1
+        obj = self._objects[key] = cls(client, data)
+        if not self.weak and self.maxsize is not None and len(self._objects) > self.maxsize:
+            self._objects.popitem(last=False)
+        return obj
+
+    def clear(self):
+        """Forgets all mapped objects."""
+        self._objects.clear()
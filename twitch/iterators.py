@@ -21,20 +21,29 @@
 #  SOFTWARE.
 import asyncio
 from abc import abstractmethod
-from collections import AsyncIterator
-from itertools import zip_longest
-from typing import Any, Optional, List
+from collections import deque
+from collections.abc import AsyncIterator
+from functools import partial
+from typing import Any, AsyncGenerator, Optional, List
 
 from .errors import NoMoreItems
 from .game import Game
+from .planner import plan_requests
+from .ratelimit import Priority
 from .stream import Stream
 from .user import User
-from .utils import chunks
 
 __all__ = ("GameIterator", "StreamIterator", "UserIterator")
 
 
 class _AsyncIterator(AsyncIterator):
+    """Base of the paginated iterators.
+
+    Items are decoded a page at a time into a plain buffer. Besides item by item
+    iteration, whole pages can be consumed with :meth:`pages` and everything can be
+    collected with :meth:`flatten`.
+    """
+
     async def __anext__(self) -> Any:
         try:
             msg = await self.next()
@@ -43,67 +52,223 @@ class _AsyncIterator(AsyncIterator):
         else:
             return msg
 
+    async def next(self) -> Any:
+        """Returns the next item.
+
+        Raises
+        ------
+        NoMoreItems
+            The iterator is exhausted.
+        """
+        if not self._buffer:
+            page = await self._next_page()
+            if page is None:
+                raise NoMoreItems()
+            self._buffer.extend(page)
+        return self._buffer.popleft()
+
+    async def pages(self) -> AsyncGenerator[List[Any], None]:
+        """Yields the remaining items a page at a time, as lists."""
+        if self._buffer:
+            page = list(self._buffer)
+            self._buffer.clear()
+            yield page
+        while True:
+            page = await self._next_page()
+            if page is None:
+                return
+            yield page
+
+    async def flatten(self) -> List[Any]:
+        """Collects all remaining items into a list."""
+        items = list(self._buffer)
+        self._buffer.clear()
+        while True:
+            page = await self._next_page()
+            if page is None:
+                return items
+            items.extend(page)
+
+    async def to_list(self) -> List[Any]:
+        """An alias for :meth:`flatten`."""
+        return await self.flatten()
+
+    @abstractmethod
+    async def _next_page(self) -> Optional[List[Any]]:
+        """Returns the next non-empty page of items, or ``None`` when exhausted."""
+        raise NotImplementedError
+
+
+def _models(client, cls, data: List[dict]) -> List[Any]:
+    # Goes through the client's identity map, if any, so known entities are updated.
+    identity_map = getattr(client, "identity_map", None)
+    if identity_map is None:
+        return [cls(client, element) for element in data]
+    return [identity_map.load(cls, client, element) for element in data]
+
+
+def _lookup_priority(*keys: Optional[List[str]]) -> Priority:
+    total = sum(len(k) for k in keys if k)
+    return Priority.INTERACTIVE if total <= 100 else Priority.BULK
+
+
+class _LookupIterator(_AsyncIterator):
+    """Base of iterators that look entities up in chunks of keys.
+
+    The keys are packed into as few requests as possible by :func:`plan_requests`,
+    keeping keys that are cached or already being fetched apart from the ones that
+    have to be requested. Up to ``concurrency`` chunk requests are in flight at once.
+    New requests are only dispatched when the consumer asks for more items, so at most
+    ``concurrency`` responses are held in memory. With ``ordered`` results follow the
+    order of the chunks, otherwise chunks are yielded as they arrive.
+    """
+
+    _model = None
+
+    def __init__(self, concurrency: int, ordered: bool, requests: List[tuple]):
+        if concurrency < 1:
+            raise ValueError("'concurrency' must be at least 1")
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self._requests = iter(requests)
+        self._buffer = deque()
+        self._pending = deque()
+
     @abstractmethod
-    async def next(self):
-        raise NotImplemented
+    def _fetch(self, *chunk):
+        raise NotImplementedError
+
+    def _dispatch(self):
+        while len(self._pending) < self.concurrency:
+            chunk = next(self._requests, None)
+            if chunk is None:
+                break
+            self._pending.append(asyncio.ensure_future(self._fetch(*chunk)))
+
+    async def _next_response(self) -> Optional[dict]:
+        self._dispatch()
+        if not self._pending:
+            return None
+
+        if self.ordered:
+            task = self._pending[0]
+            await asyncio.wait((task,))
+        else:
+            done, _ = await asyncio.wait(self._pending, return_when=asyncio.FIRST_COMPLETED)
+            task = done.pop()
+        self._pending.remove(task)
+        self._dispatch()
+        return task.result()
+
+    async def _next_page(self) -> Optional[List[Any]]:
+        while True:
+            resp = await self._next_response()
+            if resp is None:
+                return None
+            if resp["data"]:
+                return _models(self.client, self._model, resp["data"])
+
+    def __del__(self):
+        for task in getattr(self, "_pending", ()):
+            task.cancel()
 
 
-class GameIterator(_AsyncIterator):
+class GameIterator(_LookupIterator):
+    _model = Game
+
     def __init__(
-        self, client, ids: Optional[List[str]] = None, names: Optional[List[str]] = None,
+        self,
+        client,
+        ids: Optional[List[str]] = None,
+        names: Optional[List[str]] = None,
+        priority: Optional[Priority] = None,
+        concurrency: int = 4,
+        ordered: bool = True,
     ):
         if ids is None and names is None:
             raise TypeError("Missing one of positional arguments: 'ids', 'names'")
         self.client = client
-        self.ids = chunks(list(set(ids)) if ids else [], 100)
-        self.names = chunks(list(set(names)) if names else [], 100)
+        self.priority = _lookup_priority(ids, names) if priority is None else priority
+        known = partial(self.client.http.known, "/games")
+        requests = plan_requests([("id", ids, str), ("name", names, str)], known)
+        super().__init__(concurrency, ordered, requests)
 
         self.get_games = self.client.http.get_games
-        self.games = asyncio.Queue()
-
-    async def next(self) -> Game:
-        if self.games.empty():
-            await self.fill_games()
-
-        try:
-            return self.games.get_nowait()
-        except asyncio.QueueEmpty:
-            raise NoMoreItems()
-
-    async def fill_games(self):
-        ids = next(self.ids, None)
-        names = next(self.names, None)
-        if ids is None and names is None:
-            return
-
-        resp = await self.get_games(ids, names)
-        data = resp["data"]
-        if not data:
-            return
 
-        for element in data:
-            await self.games.put(Game(self.client, element))
+    def _fetch(self, ids, names):
+        return self.get_games(ids, names, priority=self.priority)
+
+
+async def _prefetch_streams(
+    get_streams, pages: asyncio.Queue, limit: Optional[int], priority: Priority, filters: dict
+):
+    """Fetches stream pages ahead of the consumer into ``pages``. The next page is
+    requested as soon as the cursor of the previous one arrives; the queue size bounds
+    how far ahead it runs. Ends with ``None``, or with the exception that stopped it.
+
+    Deliberately holds no reference to the iterator, so an abandoned iterator can be
+    collected and cancel it.
+    """
+    cursor = None
+    try:
+        while limit is None or limit > 0:
+            retrieve = 100 if limit is None or limit > 100 else limit
+            resp = await get_streams(first=retrieve, after=cursor, priority=priority, **filters)
+            data = resp["data"]
+            previous, cursor = cursor, resp["pagination"].get("cursor")
+            if limit is not None:
+                limit -= len(data)
+            await pages.put(data)
+            if len(data) < 100 or not cursor or cursor == previous:
+                break
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await pages.put(e)
+        return
+    await pages.put(None)
+
+
+def _compact_id(stream_id: str):
+    # Stream IDs are numeric; an int takes much less memory in a set than a str.
+    try:
+        return int(stream_id)
+    except ValueError:
+        return stream_id
 
 
 class StreamIterator(_AsyncIterator):
-    def __init__(self, client, limit: int = 100):
+    def __init__(
+        self,
+        client,
+        limit: int = 100,
+        priority: Optional[Priority] = None,
+        prefetch: int = 0,
+        snapshot: bool = False,
+        reconcile: bool = False,
+    ):
         self.client = client
         self.limit = limit
-
+        self._initial_limit = limit
+        if priority is None:
+            bulk = limit is None or limit > 100
+            priority = Priority.BULK if bulk else Priority.INTERACTIVE
+        self.priority = priority
+        self.prefetch = prefetch
+        self.snapshot = snapshot or reconcile
+        self.reconcile = reconcile
+        self.seen = set()
+        self.duplicates = 0
+        self.reconciled = 0
+
+        self._reconciling = False
         self._cursor = None
         self._filter = {}
+        self._pages = None
+        self._prefetcher = None
+        self._buffer = deque()
 
         self.get_streams = self.client.http.get_streams
-        self.streams = asyncio.Queue()
-
-    async def next(self) -> Stream:
-        if self.streams.empty():
-            await self.fill_streams()
-
-        try:
-            return self.streams.get_nowait()
-        except asyncio.QueueEmpty:
-            raise NoMoreItems()
 
     def _get_retrieve(self):
         limit = self.limit
@@ -133,62 +298,142 @@ class StreamIterator(_AsyncIterator):
         self._filter.update({k: v for k, v in locals().items() if isinstance(v, list)})
         return self
 
-    async def fill_streams(self):
-        if self._get_retrieve():
-            resp = await self.get_streams(first=self.retrieve, after=self._cursor, **self._filter)
-            data = resp["data"]
-            if len(data) < 100:
-                self.limit = 0
-            elif self.limit is not None:
-                self.limit -= len(data)
-            if resp["pagination"].get("cursor"):
-                self._cursor = resp["pagination"]["cursor"]
-
+    def close(self):
+        """Stops fetching pages ahead. Called automatically when the iterator is
+        exhausted or garbage collected."""
+        if self._prefetcher is not None:
+            self._prefetcher.cancel()
+
+    def __del__(self):
+        self.close()
+
+    async def raw_pages(self) -> AsyncGenerator[List[dict], None]:
+        """Yields the remaining pages as decoded JSON, without creating :class:`Stream`
+        objects. Should not be mixed with item iteration."""
+        while True:
+            data = await self._next_raw_page()
+            if data is None:
+                return
+            yield data
+
+    async def _next_page(self) -> Optional[List[Stream]]:
+        data = await self._next_raw_page()
+        if data is None:
+            return None
+        return _models(self.client, Stream, data)
+
+    async def _next_raw_page(self) -> Optional[List[dict]]:
+        """Returns the next non-empty page as decoded JSON, or ``None`` when exhausted.
+
+        In snapshot mode streams that were already returned are dropped. Only their IDs
+        are remembered, so memory stays small even for full platform crawls.
+        """
+        while True:
+            cursor = self._cursor
+            data = await self._fetch_raw_page()
+            if data is None:
+                if self.reconcile and not self._reconciling:
+                    self._start_reconciliation()
+                    continue
+                return None
+            if not self.snapshot:
+                return data
+
+            seen = self.seen
+            fresh = []
             for element in data:
-                await self.streams.put(Stream(self.client, element))
+                key = _compact_id(element["id"])
+                if key in seen:
+                    self.duplicates += 1
+                else:
+                    seen.add(key)
+                    fresh.append(element)
+            if self._reconciling:
+                self.reconciled += len(fresh)
+            if fresh:
+                return fresh
+            if not self.prefetch and self._cursor == cursor:
+                # Nothing new and no progress: stop instead of refetching the same page.
+                self.limit = 0
 
+    def _start_reconciliation(self):
+        # Streams that moved up the list between two pages were skipped by the walk;
+        # a second walk from the top yields them, everything else is a duplicate.
+        self.close()
+        self._reconciling = True
+        self._cursor = None
+        self._pages = None
+        self._prefetcher = None
+        self.limit = self._initial_limit
+
+    async def _fetch_raw_page(self) -> Optional[List[dict]]:
+        if self.prefetch > 0:
+            return await self._next_prefetched_page()
+
+        if not self._get_retrieve():
+            return None
+        resp = await self.get_streams(
+            first=self.retrieve, after=self._cursor, priority=self.priority, **self._filter
+        )
+        data = resp["data"]
+        cursor = resp["pagination"].get("cursor")
+        if len(data) < 100 or not cursor or cursor == self._cursor:
+            # Without a new cursor the next request would return the same page again.
+            self.limit = 0
+        elif self.limit is not None:
+            self.limit -= len(data)
+        self._cursor = cursor
+        return data or None
+
+    async def _next_prefetched_page(self) -> Optional[List[dict]]:
+        if self._pages is None:
+            self._pages = asyncio.Queue(self.prefetch)
+            self._prefetcher = asyncio.ensure_future(
+                _prefetch_streams(
+                    self.get_streams, self._pages, self.limit, self.priority, dict(self._filter)
+                )
+            )
+        if self.limit == 0:
+            return None
+
+        page = await self._pages.get()
+        if page is None or isinstance(page, Exception):
+            self.limit = 0
+            self.close()
+            if page is not None:
+                raise page
+            return None
+
+        if self.limit is not None:
+            self.limit -= len(page)
+            if self.limit <= 0:
+                self.close()
+        return page or None
+
+
+class UserIterator(_LookupIterator):
+    _model = User
 
-class UserIterator(_AsyncIterator):
     def __init__(
-        self, client, ids: Optional[List[str]] = None, logins: Optional[List[str]] = None,
+        self,
+        client,
+        ids: Optional[List[str]] = None,
+        logins: Optional[List[str]] = None,
+        priority: Optional[Priority] = None,
+        concurrency: int = 4,
+        ordered: bool = True,
     ):
         self.client = client
-        self.ids = chunks(list(set(ids)), 100) if ids else None
-        self.logins = chunks(list(set(logins)), 100) if logins else None
+        self.priority = _lookup_priority(ids, logins) if priority is None else priority
+        if not ids and not logins:
+            # Without IDs and logins the user is looked up by Bearer token.
+            requests = [(None, None)]
+        else:
+            known = partial(self.client.http.known, "/users")
+            requests = plan_requests([("id", ids, str), ("login", logins, str.lower)], known)
+        super().__init__(concurrency, ordered, requests)
 
         self.get_users = self.client.http.get_users
-        self.users = asyncio.Queue()
-
-    async def next(self) -> User:
-        if self.users.empty():
-            await self.fill_users()
-
-        try:
-            return self.users.get_nowait()
-        except asyncio.QueueEmpty:
-            raise NoMoreItems()
-
-    async def fill_users(self):
-        if self.ids is None and self.logins is None:
-            return await self._get_elements(self.ids, self.logins)
-
-        ids = next(self.ids, None) if self.ids else None
-        logins = next(self.logins, None) if self.logins else None
-        if ids is None and logins is None:
-            return
-
-        if ids and logins and len(ids) + len(logins) > 100:
-            for ids, logins in zip_longest(chunks(ids, 50), chunks(logins, 50)):
-                await self._get_elements(ids, logins)
-            return
-
-        await self._get_elements(ids, logins)
-
-    async def _get_elements(self, ids, logins):
-        resp = await self.get_users(ids, logins)
-        data = resp["data"]
-        if not data:
-            return
 
-        for element in data:
-            await self.users.put(User(self.client, element))
+    def _fetch(self, ids, logins):
+        return self.get_users(ids, logins, priority=self.priority)
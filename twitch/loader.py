@@ -0,0 +1,163 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import asyncio
+from operator import attrgetter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .errors import HTTPException
+
+__all__ = ("BatchLoader",)
+
+
+def _retrieve(future: asyncio.Future):
+    # Marks the exception as retrieved in case every waiter was cancelled.
+    if not future.cancelled():
+        future.exception()
+
+
+class BatchLoader:
+    """Batches single-key lookups made close together into one request.
+
+    Keys passed to :meth:`load` are collected until the current event loop iteration
+    ends, or for ``window`` seconds, and fetched together with one call of ``fetch``.
+    A batch is sent early once it holds ``max_batch`` keys. Concurrent loads of the
+    same key, including keys of batches still in flight, share one result.
+
+    If a batch is rejected with status 400, e.g. because of one malformed key, it is
+    split in halves and retried, so only the callers of the bad key get the error.
+
+    Attributes
+    -----------
+    fetch : Callable[[List[str]], Awaitable[List[Any]]]
+        Fetches the models of a list of keys. Keys that were not found are left out.
+    key : Callable[[Any], str]
+        Returns the key of a fetched model.
+    normalize : Optional[Callable[[str], str]]
+        Applied to requested and fetched keys before matching them, e.g. :meth:`str.lower`
+        for case-insensitive keys.
+    max_batch : int
+        Maximum number of keys per batch. Defaults to 100.
+    window : float
+        Seconds to wait for more keys after the first one. Defaults to 0, which batches
+        the loads made within one event loop iteration.
+    loads : int
+        Number of :meth:`load` calls.
+    batches : int
+        Number of batches sent, not counting retries of split batches.
+
+    """
+
+    __slots__ = (
+        "fetch",
+        "key",
+        "normalize",
+        "max_batch",
+        "window",
+        "loads",
+        "batches",
+        "_futures",
+        "_pending",
+        "_handle",
+    )
+
+    def __init__(
+        self,
+        fetch: Callable[[List[str]], Awaitable[List[Any]]],
+        key: Callable[[Any], str] = attrgetter("id"),
+        normalize: Optional[Callable[[str], str]] = None,
+        max_batch: int = 100,
+        window: float = 0.0,
+    ):
+        self.fetch = fetch
+        self.key = key
+        self.normalize = normalize
+        self.max_batch = max_batch
+        self.window = window
+        self.loads = 0
+        self.batches = 0
+        self._futures = {}
+        self._pending = []
+        self._handle = None
+
+    async def load(self, key: str) -> Optional[Any]:
+        """Returns the model of ``key``, or ``None`` if it was not found."""
+        self.loads += 1
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_event_loop()
+            future = loop.create_future()
+            future.add_done_callback(_retrieve)
+            self._futures[key] = future
+            self._pending.append(key)
+            if len(self._pending) >= self.max_batch:
+                self._dispatch()
+            elif self._handle is None:
+                if self.window > 0:
+                    self._handle = loop.call_later(self.window, self._dispatch)
+                else:
+                    self._handle = loop.call_soon(self._dispatch)
+        # A cancelled caller must not cancel the result shared with other callers.
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        keys, self._pending = self._pending, []
+        if keys:
+            self.batches += 1
+            asyncio.ensure_future(self._resolve({key: self._futures[key] for key in keys}))
+
+    async def _resolve(self, batch: Dict[str, asyncio.Future]):
+        try:
+            await self._resolve_batch(batch)
+        finally:
+            for key, future in batch.items():
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+
+    async def _resolve_batch(self, batch: Dict[str, asyncio.Future]):
+        try:
+            models = await self.fetch(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            if len(batch) > 1 and isinstance(e, HTTPException) and e.response.status == 400:
+                keys = list(batch)
+                half = len(keys) // 2
+                await asyncio.gather(
+                    self._resolve_batch({k: batch[k] for k in keys[:half]}),
+                    self._resolve_batch({k: batch[k] for k in keys[half:]}),
+                )
+                return
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        normalize = self.normalize or str
+        found = {normalize(self.key(model)): model for model in models}
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(normalize(key)))
@@ -0,0 +1,182 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import bisect
+from typing import Iterable, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .http import HTTPClient, Route
+
+__all__ = ("Metrics",)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], **extra) -> str:
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in items
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _route(route: "Route") -> Tuple[Tuple[str, str], ...]:
+    return (("method", route.method), ("path", route.path))
+
+
+class Metrics:
+    """In-memory registry of HTTP client metrics.
+
+    Attached to an :class:`HTTPClient` through its request hooks, it keeps per-route
+    request and response counters, latency histograms of rate limit waits, network
+    time and JSON parsing, and the last reported ``Ratelimit-Remaining``.
+
+    Attributes
+    -----------
+    buckets : Tuple[float, ...]
+        Upper bounds of the histogram buckets in seconds.
+    counters : dict
+        Counter values keyed by metric name and a tuple of label pairs.
+    histograms : dict
+        Histograms keyed by metric name and a tuple of label pairs.
+    gauges : dict
+        Gauge values keyed by metric name and a tuple of label pairs.
+
+    """
+
+    HELP = {
+        "twitch_requests_total": ("counter", "Requests started, not counting retries."),
+        "twitch_responses_total": ("counter", "Responses received by status."),
+        "twitch_errors_total": ("counter", "Requests that failed after all retries."),
+        "twitch_retries_total": ("counter", "Retried requests."),
+        "twitch_coalesced_total": ("counter", "Requests served by an identical request."),
+        "twitch_token_refreshes_total": ("counter", "App access tokens requested."),
+        "twitch_request_duration_seconds": ("histogram", "Request time including retries."),
+        "twitch_ratelimit_wait_seconds": ("histogram", "Time spent waiting on rate limit."),
+        "twitch_network_seconds": ("histogram", "Time until the response body is read."),
+        "twitch_parse_seconds": ("histogram", "Time spent decoding response bodies."),
+        "twitch_ratelimit_remaining": ("gauge", "Last reported Ratelimit-Remaining."),
+    }
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = _Histogram(self.buckets)
+        histogram.observe(value)
+
+    def set(self, name: str, value: float, labels: tuple = ()):
+        self.gauges[(name, labels)] = value
+
+    def attach(self, http: "HTTPClient"):
+        """Registers the hooks that feed this registry."""
+        http.add_hook("request_start", self._on_request_start)
+        http.add_hook("request_end", self._on_request_end)
+        http.add_hook("response", self._on_response)
+        http.add_hook("ratelimit_wait", self._on_ratelimit_wait)
+        http.add_hook("retry", self._on_retry)
+        http.add_hook("coalesced", self._on_coalesced)
+        http.add_hook("token_refresh", self._on_token_refresh)
+
+    def _on_request_start(self, route: "Route"):
+        self.inc("twitch_requests_total", _route(route))
+
+    def _on_request_end(self, route: "Route", elapsed: float, error: Optional[Exception]):
+        labels = _route(route)
+        self.observe("twitch_request_duration_seconds", elapsed, labels)
+        if error is not None:
+            self.inc("twitch_errors_total", labels + (("error", type(error).__name__),))
+
+    def _on_response(
+        self, route: "Route", status: int, network: float, parse: float, remaining: Optional[str]
+    ):
+        labels = _route(route)
+        self.inc("twitch_responses_total", labels + (("status", str(status)),))
+        self.observe("twitch_network_seconds", network, labels)
+        self.observe("twitch_parse_seconds", parse, labels)
+        if remaining is not None:
+            self.set("twitch_ratelimit_remaining", float(remaining))
+
+    def _on_ratelimit_wait(self, route: "Route", waited: float):
+        self.observe("twitch_ratelimit_wait_seconds", waited, _route(route))
+
+    def _on_retry(self, route: "Route", attempt: int, delay: float):
+        self.inc("twitch_retries_total", _route(route))
+
+    def _on_coalesced(self, route: "Route"):
+        self.inc("twitch_coalesced_total", _route(route))
+
+    def _on_token_refresh(self, client_id: str):
+        self.inc("twitch_token_refreshes_total", (("client_id", client_id),))
+
+    def to_prometheus(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        families = {}
+        for store in (self.counters, self.histograms, self.gauges):
+            for name, labels in store:
+                families.setdefault(name, []).append((labels, store[(name, labels)]))
+
+        for name in sorted(families):
+            kind, help_text = self.HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(families[name], key=lambda item: item[0]):
+                if isinstance(value, _Histogram):
+                    cumulative = 0
+                    for bound, count in zip(value.buckets, value.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+                    lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {value.count}')
+                    lines.append(f"{name}_sum{_labels(labels)} {value.sum}")
+                    lines.append(f"{name}_count{_labels(labels)} {value.count}")
+                else:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,81 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+__all__ = ("MAX_LOOKUP_PARAMS", "plan_requests")
+
+# Helix accepts at most 100 lookup parameters per request, whatever their names.
+MAX_LOOKUP_PARAMS = 100
+
+Lookup = Tuple[str, Optional[Iterable[str]], Callable[[str], str]]
+
+
+def plan_requests(
+    lookups: Sequence[Lookup],
+    known: Optional[Callable[[str, str], bool]] = None,
+    limit: int = MAX_LOOKUP_PARAMS,
+) -> List[Tuple[List[str], ...]]:
+    """Packs a lookup of several kinds of keys into as few requests as possible.
+
+    Keys are deduplicated per parameter after normalization and packed in order, up to
+    ``limit`` keys per request regardless of their parameter, so ``n`` unknown keys
+    take ``ceil(n / limit)`` requests. Keys for which ``known`` returns ``True``, e.g.
+    cached ones, are packed into separate requests placed first, so they do not take
+    room in requests that reach the API.
+
+    Parameters
+    ----------
+    lookups : Sequence[Tuple[str, Optional[Iterable[str]], Callable[[str], str]]]
+        Tuples of a query parameter, the requested keys and a key normalizer, e.g.
+        ``("login", logins, str.lower)``.
+    known : Optional[Callable[[str, str], bool]]
+        Called with a parameter and a normalized key.
+    limit : int
+        Maximum number of keys per request. Defaults to 100.
+
+    Returns
+    -------
+    List[Tuple[List[str], ...]]
+        Requests, each a tuple of key lists in the order of ``lookups``.
+    """
+    known_keys = []
+    unknown_keys = []
+    for index, (param, values, normalize) in enumerate(lookups):
+        seen = set()
+        for value in values or ():
+            key = normalize(value)
+            if key in seen:
+                continue
+            seen.add(key)
+            if known is not None and known(param, key):
+                known_keys.append((index, value))
+            else:
+                unknown_keys.append((index, value))
+
+    requests = []
+    for keys in (known_keys, unknown_keys):
+        for start in range(0, len(keys), limit):
+            request = tuple([] for _ in lookups)
+            for index, value in keys[start : start + limit]:
+                request[index].append(value)
+            requests.append(request)
+    return requests
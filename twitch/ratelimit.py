@@ -0,0 +1,233 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import suppress
+from enum import IntEnum
+from typing import Mapping, Optional
+
+__all__ = ("Priority", "RateLimiter")
+
+
+class Priority(IntEnum):
+    """Request priority classes. Lower values are admitted first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+class PriorityStats:
+    """Admission statistics of one priority class.
+
+    Attributes
+    -----------
+    waiting : int
+        Requests currently queued for budget.
+    admitted : int
+        Requests admitted so far.
+    total_wait : float
+        Seconds admitted requests spent queued in total.
+    max_wait : float
+        Longest time a request spent queued.
+
+    """
+
+    __slots__ = ("waiting", "admitted", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.waiting = 0
+        self.admitted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.admitted if self.admitted else 0.0
+
+    def _admit(self, waited: float):
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def __repr__(self):
+        return (
+            f"<PriorityStats waiting={self.waiting} admitted={self.admitted} "
+            f"mean_wait={self.mean_wait:.3f} max_wait={self.max_wait:.3f}>"
+        )
+
+
+class RateLimiter:
+    """Token bucket shared by every request made with one access token.
+
+    Helix accounts the rate limit per token, not per endpoint, and refills the bucket
+    continuously. The limiter mirrors that: requests are admitted immediately while
+    budget remains, the bucket refills locally at the rate implied by the
+    ``Ratelimit-*`` headers and is resynchronised from every response.
+
+    Once the budget runs out, queued requests are admitted by :class:`Priority` and
+    then in arrival order. Lower priority classes additionally leave a share of the
+    bucket untouched, so bulk work never drains the budget interactive calls need.
+
+    Attributes
+    -----------
+    limit : int
+        Bucket capacity, taken from ``Ratelimit-Limit``.
+    period : float
+        Seconds in which an empty bucket refills when no reset is known.
+    reserve : float
+        Share of the bucket kept per priority class above :attr:`Priority.INTERACTIVE`.
+        With the default of 0.1, ``NORMAL`` requests leave 10% and ``BULK`` requests
+        20% of the bucket to higher priorities.
+    tokens : float
+        Estimated number of requests that can be sent right now.
+    pending : int
+        Number of admitted requests whose response has not arrived yet.
+    stats : Dict[:class:`Priority`, PriorityStats]
+        Queue depth and wait time per priority class.
+
+    """
+
+    def __init__(self, limit: int = 800, period: float = 60.0, reserve: float = 0.1):
+        self.limit = limit
+        self.period = period
+        self.reserve = reserve
+        self.tokens = float(limit)
+        self.pending = 0
+        self.stats = {priority: PriorityStats() for priority in Priority}
+        self._rate = limit / period
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._counter = itertools.count()
+        self._pump = None
+        self._wakeup = None
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(float(self.limit), self.tokens + elapsed * self._rate)
+        self._updated = now
+
+    def _threshold(self, priority: Priority) -> float:
+        return 1 + self.limit * self.reserve * priority
+
+    def _take(self, priority: Priority = Priority.INTERACTIVE) -> bool:
+        self._refill(time.monotonic())
+        if self.tokens >= self._threshold(priority):
+            self.tokens -= 1
+            self.pending += 1
+            return True
+        return False
+
+    def delay(self, priority: Priority = Priority.INTERACTIVE) -> float:
+        """Seconds until a request of ``priority`` can be admitted."""
+        self._refill(time.monotonic())
+        missing = self._threshold(priority) - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self._rate
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE):
+        """Waits until the bucket admits one request of ``priority``.
+
+        Requests pass straight through while budget remains and nobody is queued.
+        Otherwise they are queued and admitted as the bucket refills.
+        """
+        stats = self.stats[priority]
+        if not self._waiters and self._take(priority):
+            stats._admit(0.0)
+            return
+
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        stats.waiting += 1
+        queued = time.monotonic()
+        self._notify()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted right before the cancellation, give the budget back.
+                self.pending = max(0, self.pending - 1)
+                self.tokens += 1
+            raise
+        finally:
+            stats.waiting -= 1
+        stats._admit(time.monotonic() - queued)
+
+    def _notify(self):
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.ensure_future(self._admit_waiters())
+        elif self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    async def _admit_waiters(self):
+        loop = asyncio.get_event_loop()
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                # Cancelled while queued.
+                heapq.heappop(self._waiters)
+                continue
+            if self._take(priority):
+                heapq.heappop(self._waiters)
+                future.set_result(None)
+                continue
+
+            # Sleep until the head can be admitted or the queue or bucket changes.
+            self._wakeup = loop.create_future()
+            await asyncio.wait({self._wakeup}, timeout=self.delay(priority))
+            self._wakeup = None
+
+    def release(self, headers: Optional[Mapping[str, str]] = None):
+        """Marks an admitted request as finished and resynchronises the bucket from
+        its response headers, if any."""
+        self.pending = max(0, self.pending - 1)
+        if headers is not None:
+            self.update(headers)
+            if self._waiters:
+                self._notify()
+
+    def update(self, headers: Mapping[str, str]):
+        try:
+            limit = int(headers["Ratelimit-Limit"])
+            remaining = int(headers["Ratelimit-Remaining"])
+        except (KeyError, ValueError):
+            return
+
+        now = time.monotonic()
+        self._refill(now)
+        self.limit = limit
+        # Requests still in flight may not be accounted by the server yet, so they are
+        # deducted from the reported budget to stay on the safe side.
+        self.tokens = float(max(0, min(limit, remaining - self.pending)))
+
+        rate = limit / self.period
+        reset = headers.get("Ratelimit-Reset")
+        if reset is not None and remaining < limit:
+            with suppress(ValueError):
+                until_reset = float(reset) - time.time()
+                if until_reset > 0:
+                    rate = (limit - remaining) / until_reset
+        self._rate = max(rate, 1 / self.period)
@@ -0,0 +1,300 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import asyncio
+import hashlib
+import hmac
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlparse
+
+from aiohttp import web
+
+from .iterators import _models
+from .stream import Stream
+from .user import User
+from .webhook import StreamChanged, Subscription, UserChanged
+
+__all__ = ("Notification", "WebhookReceiver")
+
+log = logging.getLogger(__name__)
+
+
+def _topic_key(uri: str) -> Tuple[str, tuple]:
+    # Topics are compared by path and query, in any parameter order.
+    url = urlparse(uri)
+    return url.path.rstrip("/"), tuple(sorted(parse_qsl(url.query)))
+
+
+def _self_link(header: str) -> Optional[str]:
+    # Link: <https://api.twitch.tv/helix/webhooks/hub>; rel="hub", <topic>; rel="self"
+    for link in header.split(","):
+        url, _, params = link.partition(";")
+        if 'rel="self"' in params.replace(" ", ""):
+            return url.strip().strip("<>")
+    return None
+
+
+class Notification:
+    """A webhook notification.
+
+    Attributes
+    -----------
+    subscription : :class:`Subscription`
+        Subscription the notification was delivered for.
+    id : Optional[str]
+        Notification ID sent by Twitch.
+    data : List[dict]
+        Payload entries.
+    items : List[Union[:class:`Stream`, :class:`User`, dict]]
+        Entries as :class:`Stream` for :class:`StreamChanged` topics, :class:`User` for
+        :class:`UserChanged` topics and as dicts for other topics. A stream notification
+        without items means the stream went offline.
+
+    """
+
+    __slots__ = ("subscription", "id", "data", "items")
+
+    def __init__(
+        self,
+        subscription: Subscription,
+        id: Optional[str],
+        data: List[dict],
+        items: List[Union[Stream, User, dict]],
+    ):
+        self.subscription = subscription
+        self.id = id
+        self.data = data
+        self.items = items
+
+    @property
+    def topic(self):
+        return self.subscription.topic
+
+
+Handler = Callable[[Notification], Union[Awaitable[Any], Any]]
+
+
+class WebhookReceiver:
+    """Receives webhook notifications of subscriptions and dispatches them to handlers.
+
+    Answers the subscription verification challenge of registered topics, verifies the
+    ``X-Hub-Signature`` of notifications against the subscription's secret in constant
+    time, parses the payload and acknowledges it right away. Handlers run in a pool of
+    ``workers`` tasks fed by a queue of ``queue_size`` notifications, so slow handlers
+    do not delay the acknowledgements. When the queue stays full for ``put_timeout``
+    seconds, the notification is answered with 503 instead of being held in memory.
+
+    Redelivered notifications are recognized by their ID and acknowledged without
+    being dispatched again.
+
+    Usage::
+
+        receiver = client.create_webhook_receiver()
+        await receiver.start(port=8080)
+        await receiver.subscribe(subscription, handler)
+
+    The application from :meth:`make_app` can also be mounted into an existing one with
+    :meth:`aiohttp.web.Application.add_subapp`.
+
+    Attributes
+    -----------
+    path : str
+        Path of the callback endpoint.
+    workers : int
+        Number of handler tasks.
+    queue_size : int
+        Maximum number of notifications waiting for a handler.
+    put_timeout : float
+        Seconds to wait for room in the queue before answering 503.
+    received : int
+        Number of accepted notifications.
+    rejected : int
+        Number of notifications with an invalid signature or an unknown topic.
+    overloaded : int
+        Number of notifications answered with 503 because the queue was full.
+    errors : int
+        Number of handler calls that raised.
+
+    """
+
+    def __init__(
+        self,
+        client,
+        path: str = "/webhooks",
+        workers: int = 8,
+        queue_size: int = 1000,
+        put_timeout: float = 1.0,
+    ):
+        if workers < 1:
+            raise ValueError("'workers' must be at least 1")
+        self.client = client
+        self.path = path
+        self.workers = workers
+        self.queue_size = queue_size
+        self.put_timeout = put_timeout
+        self.received = 0
+        self.rejected = 0
+        self.overloaded = 0
+        self.errors = 0
+
+        self._subscriptions = {}
+        self._seen = set()
+        self._seen_order = deque()
+        self._queue = None
+        self._workers = []
+        self._runner = None
+
+    def add(self, subscription: Subscription, handler: Handler):
+        """Dispatches notifications of ``subscription`` to ``handler``, which is called
+        with a :class:`Notification` and may be a coroutine function."""
+        self._subscriptions[_topic_key(subscription.topic.uri)] = subscription, handler
+
+    def remove(self, subscription: Subscription):
+        """Stops accepting notifications of ``subscription``."""
+        self._subscriptions.pop(_topic_key(subscription.topic.uri), None)
+
+    async def subscribe(self, subscription: Subscription, handler: Handler):
+        """Registers ``handler`` with :meth:`add` and subscribes to the topic. The
+        receiver must already be started, as the hub verifies the callback right away."""
+        self.add(subscription, handler)
+        return await subscription.subscribe()
+
+    async def unsubscribe(self, subscription: Subscription):
+        """Unsubscribes from the topic. Notifications are accepted until the hub
+        confirms it."""
+        return await subscription.unsubscribe()
+
+    def make_app(self) -> web.Application:
+        """Creates the application serving the callback endpoint."""
+        app = web.Application()
+        app.router.add_get(self.path, self._verify)
+        app.router.add_post(self.path, self._notify)
+        app.on_startup.append(self._start_workers)
+        app.on_cleanup.append(self._stop_workers)
+        return app
+
+    async def start(self, host: str = "0.0.0.0", port: int = 8080) -> web.AppRunner:
+        """Starts serving the callback endpoint in the running loop."""
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        return self._runner
+
+    async def close(self):
+        """Stops the server started with :meth:`start` and the handler tasks."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _start_workers(self, app: web.Application):
+        self._queue = asyncio.Queue(self.queue_size)
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+
+    async def _stop_workers(self, app: web.Application):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self):
+        while True:
+            handler, notification = await self._queue.get()
+            try:
+                result = handler(notification)
+                if asyncio.iscoroutine(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                log.exception("Webhook handler %r failed", handler)
+            finally:
+                self._queue.task_done()
+
+    async def _verify(self, request: web.Request) -> web.Response:
+        query = request.query
+        entry = self._subscriptions.get(_topic_key(query.get("hub.topic", "")))
+        if entry is None:
+            return web.Response(status=404)
+        mode = query.get("hub.mode")
+        if mode == "denied":
+            log.warning("Subscription to %s denied: %s", entry[0], query.get("hub.reason"))
+            return web.Response()
+        challenge = query.get("hub.challenge")
+        if challenge is None:
+            return web.Response(status=400)
+        if mode == "unsubscribe":
+            self.remove(entry[0])
+        return web.Response(text=challenge)
+
+    async def _notify(self, request: web.Request) -> web.Response:
+        topic = _self_link(request.headers.get("Link", ""))
+        entry = self._subscriptions.get(_topic_key(topic)) if topic else None
+        if entry is None:
+            self.rejected += 1
+            return web.Response(status=404)
+        subscription, handler = entry
+
+        body = await request.read()
+        if subscription.secret:
+            digest = hmac.new(subscription.secret.encode(), body, hashlib.sha256).hexdigest()
+            # Header values may hold any bytes, which compare_digest rejects in a str.
+            signature = request.headers.get("X-Hub-Signature", "").encode(errors="surrogateescape")
+            if not hmac.compare_digest(signature, f"sha256={digest}".encode()):
+                self.rejected += 1
+                return web.Response(status=403)
+
+        notification_id = request.headers.get("Twitch-Notification-Id")
+        if notification_id is not None and notification_id in self._seen:
+            return web.Response()
+        try:
+            data = self.client.http._json_loads(body)["data"]
+        except (ValueError, KeyError, TypeError):
+            return web.Response(status=400)
+
+        if isinstance(subscription.topic, StreamChanged):
+            items = _models(self.client, Stream, data)
+        elif isinstance(subscription.topic, UserChanged):
+            items = _models(self.client, User, data)
+        else:
+            items = list(data)
+        notification = Notification(subscription, notification_id, data, items)
+
+        try:
+            self._queue.put_nowait((handler, notification))
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put((handler, notification)), self.put_timeout)
+            except asyncio.TimeoutError:
+                self.overloaded += 1
+                return web.Response(status=503)
+        self.received += 1
+        if notification_id is not None:
+            self._remember(notification_id)
+        return web.Response()
+
+    def _remember(self, notification_id: str):
+        self._seen.add(notification_id)
+        self._seen_order.append(notification_id)
+        if len(self._seen_order) > 10000:
+            self._seen.discard(self._seen_order.popleft())
@@ -0,0 +1,141 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import random
+import time
+from contextlib import suppress
+from typing import Iterable, Mapping, Optional
+
+from .errors import CircuitBreakerOpen
+
+__all__ = ("RetryPolicy", "CircuitBreaker")
+
+
+class RetryPolicy:
+    """Decides whether and when a failed request is retried.
+
+    Delays grow exponentially with "full jitter": each delay is drawn uniformly between
+    zero and the exponential backoff, so concurrent tasks do not retry in lockstep.
+    When a rate limited response carries ``Retry-After`` or ``Ratelimit-Reset``, the
+    delay is taken from the header instead.
+
+    Attributes
+    -----------
+    max_attempts : int
+        Total number of attempts, including the first one. Defaults to 5.
+    base_delay : float
+        Backoff of the first retry in seconds. Defaults to 0.5.
+    max_delay : float
+        Upper bound of a single delay in seconds. Defaults to 30.
+    statuses : FrozenSet[int]
+        Response statuses that are retried.
+    deadline : Optional[float]
+        Default time budget of a request in seconds, including retries. ``None``
+        means no deadline.
+
+    """
+
+    __slots__ = ("max_attempts", "base_delay", "max_delay", "statuses", "deadline")
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        statuses: Iterable[int] = (429, 500, 502, 503, 504),
+        deadline: Optional[float] = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = frozenset(statuses)
+        self.deadline = deadline
+
+    def retries(self, status: int) -> bool:
+        return status in self.statuses
+
+    def delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        """Returns the number of seconds to wait before retry number ``attempt + 1``."""
+        if headers is not None:
+            delay = self._header_delay(headers)
+            if delay is not None:
+                return min(self.max_delay, delay + random.uniform(0, self.base_delay))
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    @staticmethod
+    def _header_delay(headers: Mapping[str, str]) -> Optional[float]:
+        with suppress(KeyError, ValueError):
+            return max(0.0, float(headers["Retry-After"]))
+        if headers.get("Ratelimit-Remaining") == "0":
+            with suppress(KeyError, ValueError):
+                return max(0.0, float(headers["Ratelimit-Reset"]) - time.time())
+        return None
+
+
+class CircuitBreaker:
+    """Fails requests fast while the API keeps returning server errors.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and requests
+    raise :exc:`CircuitBreakerOpen` without being sent. Once ``recovery_timeout``
+    seconds have passed, a single probe request is let through: success closes the
+    circuit, failure opens it again.
+
+    Attributes
+    -----------
+    failure_threshold : int
+        Consecutive failures that open the circuit. Defaults to 5.
+    recovery_timeout : float
+        Seconds the circuit stays open before a probe request. Defaults to 10.
+    state : str
+        ``"closed"``, ``"open"`` or ``"half-open"``.
+
+    """
+
+    __slots__ = ("failure_threshold", "recovery_timeout", "state", "_failures", "_opened_at")
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+
+    def check(self):
+        """Raises :exc:`CircuitBreakerOpen` if a request must not be sent now."""
+        if self.state == "closed":
+            return
+        now = time.monotonic()
+        if now - self._opened_at >= self.recovery_timeout:
+            # Let one probe through. Another one follows if it never reports back.
+            self.state = "half-open"
+            self._opened_at = now
+            return
+        raise CircuitBreakerOpen("The API is failing, request was not sent.")
+
+    def record_success(self):
+        self.state = "closed"
+        self._failures = 0
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == "half-open" or self._failures >= self.failure_threshold:
+            self.state = "open"
+            self._opened_at = time.monotonic()
@@ -1,13 +1,15 @@
-from datetime import datetime
+from operator import itemgetter
 from typing import Optional, TYPE_CHECKING
 
+from .utils import _LazyModel, parse_timestamp
+
 if TYPE_CHECKING:
     from .user import User
     from .game import Game
     from .client import Client
 
 
-class Stream:
+class Stream(_LazyModel):
     """Represents a Twitch Stream
 
     .. container:: operations
@@ -63,10 +65,12 @@ class Stream:
         "user_id",
         "user_name",
         "viewer_count",
+        "__weakref__",
     )
 
     def __init__(self, client: "Client", data: dict):
         self.client = client
+        self._data = None
         self._update(data)
         self.game = None
         self.user = None
@@ -80,18 +84,19 @@ class Stream:
     def __ne__(self, other):
         return not self.__eq__(other)
 
-    def _update(self, data: dict):
-        self.game_id = data["game_id"]
-        self.id = data["id"]
-        self.language = data["language"]
-        self.started_at = datetime.strptime(data["started_at"], "%Y-%m-%dT%H:%M:%S%z")
-        self.tag_ids = data["tag_ids"]
-        self._thumbnail_url = data["thumbnail_url"]
-        self.title = data["title"]
-        self._type = bool(data["type"])
-        self.user_id = data["user_id"]
-        self.user_name = data["user_name"]
-        self.viewer_count = data["viewer_count"]
+    _decoders = {
+        "game_id": itemgetter("game_id"),
+        "id": itemgetter("id"),
+        "language": itemgetter("language"),
+        "started_at": lambda data: parse_timestamp(data["started_at"]),
+        "tag_ids": itemgetter("tag_ids"),
+        "_thumbnail_url": itemgetter("thumbnail_url"),
+        "title": itemgetter("title"),
+        "_type": lambda data: bool(data["type"]),
+        "user_id": itemgetter("user_id"),
+        "user_name": itemgetter("user_name"),
+        "viewer_count": itemgetter("viewer_count"),
+    }
 
     @property
     def live(self) -> bool:
@@ -124,7 +129,8 @@ class Stream:
         return self._thumbnail_url.format(width=width, height=height)
 
     async def get_game(self) -> Optional["Game"]:
-        """Returns game being played on the stream.
+        """Returns game being played on the stream. Use :meth:`Client.hydrate` to fill many
+        streams with a few requests.
 
         Returns
         -------
@@ -135,7 +141,8 @@ class Stream:
         return self.game
 
     async def get_user(self) -> Optional["User"]:
-        """Returns user who is streaming.
+        """Returns user who is streaming. Use :meth:`Client.hydrate` to fill many
+        streams with a few requests.
 
         Returns
         -------
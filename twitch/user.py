@@ -1,11 +1,14 @@
+from operator import itemgetter
 from typing import Optional, TYPE_CHECKING
 
+from .utils import _LazyModel
+
 if TYPE_CHECKING:
     from .stream import Stream
     from .client import Client
 
 
-class User:
+class User(_LazyModel):
     """Represents a Twitch User
 
     .. container:: operations
@@ -58,10 +61,12 @@ class User:
         "profile_image_url",
         "type",
         "view_count",
+        "__weakref__",
     )
 
     def __init__(self, client: "Client", data: dict):
         self.client = client
+        self._data = None
         self._update(data)
         self.stream = None
 
@@ -74,17 +79,18 @@ class User:
     def __ne__(self, other):
         return not self.__eq__(other)
 
-    def _update(self, data: dict):
-        self.broadcaster_type = data["broadcaster_type"] or None
-        self.description = data["description"] or None
-        self.display_name = data["display_name"]
-        self.email = data.get("email")
-        self.id = data["id"]
-        self.login = data["login"]
-        self.offline_image_url = data["offline_image_url"]
-        self.profile_image_url = data["profile_image_url"]
-        self.type = data["type"] or None
-        self.view_count = data["view_count"]
+    _decoders = {
+        "broadcaster_type": lambda data: data["broadcaster_type"] or None,
+        "description": lambda data: data["description"] or None,
+        "display_name": itemgetter("display_name"),
+        "email": lambda data: data.get("email"),
+        "id": itemgetter("id"),
+        "login": itemgetter("login"),
+        "offline_image_url": itemgetter("offline_image_url"),
+        "profile_image_url": itemgetter("profile_image_url"),
+        "type": lambda data: data["type"] or None,
+        "view_count": itemgetter("view_count"),
+    }
 
     async def get_stream(self) -> Optional["Stream"]:
         """Returns current user's stream.
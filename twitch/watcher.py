@@ -0,0 +1,288 @@
+#  MIT License
+#
+#  Copyright (c) 2020 Fozar
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+import asyncio
+import time
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+from .iterators import _AsyncIterator
+from .ratelimit import Priority
+from .stream import Stream
+from .utils import chunks
+
+__all__ = ("StreamEvent", "StreamWatcher")
+
+# Liveness score: moving average of "was live" over a channel's polls. Channels scoring
+# at least _HOT, or live right now, are polled every interval.
+_DECAY = 0.75
+_HOT = 0.2
+
+
+class StreamEvent:
+    """A change of a watched channel.
+
+    Attributes
+    -----------
+    type : str
+        ``"online"``, ``"offline"`` or ``"changed"``.
+    user_id : str
+        ID of the channel's user.
+    stream : Optional[:class:`Stream`]
+        Current stream. ``None`` for ``"offline"``.
+    before : Optional[:class:`Stream`]
+        Stream as of the previous poll. ``None`` for ``"online"``.
+    changes : Tuple[str, ...]
+        Names of the changed attributes, for ``"changed"``.
+
+    """
+
+    __slots__ = ("type", "user_id", "stream", "before", "changes")
+
+    def __init__(
+        self,
+        type: str,
+        user_id: str,
+        stream: Optional[Stream],
+        before: Optional[Stream],
+        changes: Tuple[str, ...] = (),
+    ):
+        self.type = type
+        self.user_id = user_id
+        self.stream = stream
+        self.before = before
+        self.changes = changes
+
+    def __repr__(self):
+        return f"<StreamEvent type={self.type!r} user_id={self.user_id!r} changes={self.changes}>"
+
+
+class StreamWatcher(_AsyncIterator):
+    """Polls the streams of many channels and yields a :class:`StreamEvent` for every
+    channel that went online or offline or changed its stream.
+
+    Polling runs in rounds. Each round requests the streams of the channels due, 100
+    user IDs per request, with the requests spread evenly over ``interval`` seconds.
+    Channels that are live or often were when polled are due every round; dormant
+    ones every ``dormant_interval`` seconds, a share of them per round. If a round
+    would use more than ``budget`` of the rate limit, it is stretched.
+
+    Events are yielded in the order their polls complete. Polling starts with the
+    iteration and runs until :meth:`close` is called or the ``async with`` block
+    is left; iteration then ends with the events already received. A failed request
+    is skipped and counted in :attr:`errors`; its channels keep their state until the
+    next round.
+
+    .. container:: operations
+        .. describe:: async with x
+            Returns the watcher and stops it on exit.
+        .. describe:: len(x)
+            Returns the number of watched channels.
+
+    Attributes
+    -----------
+    interval : float
+        Seconds between polls of live and often live channels.
+    dormant_interval : float
+        Seconds between polls of dormant channels.
+    budget : float
+        Share of the rate limit the watcher may use.
+    fields : Tuple[str, ...]
+        Stream attributes whose changes emit ``"changed"`` events.
+    initial : bool
+        Whether channels found live by their first poll emit ``"online"``.
+    live : Dict[str, :class:`Stream`]
+        Current streams of the live channels, by user ID.
+    rounds : int
+        Number of completed rounds.
+    requests : int
+        Number of sent requests.
+    errors : int
+        Number of failed requests.
+
+    """
+
+    def __init__(
+        self,
+        client,
+        user_ids: Iterable[str] = (),
+        interval: float = 60.0,
+        dormant_interval: float = 600.0,
+        budget: float = 0.5,
+        fields: Tuple[str, ...] = ("title", "game_id"),
+        initial: bool = True,
+        priority: Priority = Priority.BULK,
+    ):
+        self.client = client
+        self.interval = interval
+        self.dormant_interval = dormant_interval
+        self.budget = budget
+        self.fields = tuple(fields)
+        self.initial = initial
+        self.priority = priority
+        self.live = {}
+        self.rounds = 0
+        self.requests = 0
+        self.errors = 0
+
+        self._scores = {}
+        self.add(user_ids)
+        self._buffer = deque()
+        self._events = None
+        self._scheduler = None
+        self._polls = set()
+        self._closed = False
+
+        self.get_streams = self.client.http.get_streams
+
+    def __len__(self):
+        return len(self._scores)
+
+    def add(self, user_ids: Iterable[str]):
+        """Starts watching channels by user ID."""
+        for user_id in user_ids:
+            self._scores.setdefault(user_id, None)
+
+    def remove(self, user_ids: Iterable[str]):
+        """Stops watching channels by user ID."""
+        for user_id in user_ids:
+            self._scores.pop(user_id, None)
+            self.live.pop(user_id, None)
+
+    def _due(self, number: int) -> List[str]:
+        groups = max(1, round(self.dormant_interval / self.interval))
+        group = number % groups
+        live = self.live
+        return [
+            user_id
+            for user_id, score in self._scores.items()
+            if score is None or score >= _HOT or user_id in live or hash(user_id) % groups == group
+        ]
+
+    def _max_rate(self) -> float:
+        credentials = self.client.http.credentials
+        limiters = [credential.ratelimiter for credential in credentials]
+        return self.budget * sum(limiter.limit / limiter.period for limiter in limiters)
+
+    async def _schedule(self):
+        try:
+            while True:
+                start = time.monotonic()
+                batches = list(chunks(self._due(self.rounds), 100))
+                duration = max(self.interval, len(batches) / self._max_rate())
+                spacing = duration / max(1, len(batches))
+                for i, batch in enumerate(batches):
+                    await asyncio.sleep(max(0.0, start + i * spacing - time.monotonic()))
+                    poll = asyncio.ensure_future(self._poll(list(batch)))
+                    self._polls.add(poll)
+                    poll.add_done_callback(self._polls.discard)
+                if self._polls:
+                    await asyncio.wait(set(self._polls))
+                self.rounds += 1
+                await asyncio.sleep(max(0.0, start + duration - time.monotonic()))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._events.put(e)
+
+    async def _poll(self, user_ids: List[str]):
+        self.requests += 1
+        try:
+            resp = await self.get_streams(
+                user_ids=user_ids, first=100, coalesce=False, priority=self.priority
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.errors += 1
+            return
+        events = self._diff(user_ids, resp["data"])
+        if events:
+            await self._events.put(events)
+
+    def _diff(self, user_ids: List[str], data: List[dict]) -> List[StreamEvent]:
+        found = {element["user_id"]: element for element in data}
+        scores = self._scores
+        events = []
+        for user_id in user_ids:
+            if user_id not in scores:
+                continue  # removed while the request was in flight
+            element = found.get(user_id)
+            score = scores[user_id]
+            first = score is None
+            scores[user_id] = (_HOT if first else score) * _DECAY + (1 - _DECAY) * (
+                element is not None
+            )
+
+            before = self.live.get(user_id)
+            if element is None:
+                if before is not None:
+                    del self.live[user_id]
+                    events.append(StreamEvent("offline", user_id, None, before))
+                continue
+
+            stream = Stream(self.client, element)
+            self.live[user_id] = stream
+            if before is None:
+                if self.initial or not first:
+                    events.append(StreamEvent("online", user_id, stream, None))
+            elif before.id != stream.id:
+                # Went offline and online again between two polls.
+                events.append(StreamEvent("offline", user_id, None, before))
+                events.append(StreamEvent("online", user_id, stream, None))
+            else:
+                changes = tuple(
+                    name for name in self.fields if getattr(before, name) != getattr(stream, name)
+                )
+                if changes:
+                    events.append(StreamEvent("changed", user_id, stream, before, changes))
+        return events
+
+    async def _next_page(self) -> Optional[List[StreamEvent]]:
+        if self._closed and (self._events is None or self._events.empty()):
+            return None
+        if self._scheduler is None:
+            self._events = asyncio.Queue(100)
+            self._scheduler = asyncio.ensure_future(self._schedule())
+        events = await self._events.get()
+        if events is None:
+            return None
+        if isinstance(events, Exception):
+            self.close()
+            raise events
+        return events
+
+    async def __aenter__(self) -> "StreamWatcher":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Stops polling."""
+        self._closed = True
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+        for poll in list(self._polls):
+            poll.cancel()
+        # Wakes a consumer waiting for events. A full queue has no waiting consumer.
+        if self._events is not None and not self._events.full():
+            self._events.put_nowait(None)